@@ -1,6 +1,6 @@
 'use client';
 
-import { useState } from 'react';
+import { useRef, useState } from 'react';
 import {
   CheckoutSummary,
   CheckoutRequest,
@@ -15,6 +15,8 @@ export const useCheckout = () => {
   const [orderResponse, setOrderResponse] = useState<CheckoutResponse | null>(
     null
   );
+  // One key per checkout attempt, kept across retries and double submits
+  const idempotencyKey = useRef<string | null>(null);
 
   const fetchSummary = async () => {
     try {
@@ -45,8 +47,15 @@ export const useCheckout = () => {
     try {
       setLoading(true);
       setError(null);
-      const response = await checkoutApi.process(checkoutData);
+      if (!idempotencyKey.current) {
+        idempotencyKey.current = crypto.randomUUID();
+      }
+      const response = await checkoutApi.process(
+        checkoutData,
+        idempotencyKey.current
+      );
       setOrderResponse(response);
+      idempotencyKey.current = null;
       return true;
     } catch (err: any) {
       setError(err?.response?.data?.detail || 'Failed to process checkout');
@@ -58,6 +67,7 @@ export const useCheckout = () => {
   };
 
   const resetCheckout = () => {
+    idempotencyKey.current = null;
     setSummary(null);
     setOrderResponse(null);
     setError(null);
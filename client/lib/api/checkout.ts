@@ -3,6 +3,7 @@ import {
   CheckoutRequest,
   CheckoutResponse,
   CheckoutSummary,
+  OrderStatus,
 } from '@/types/checkout';
 
 export const checkoutApi = {
@@ -19,14 +20,19 @@ export const checkoutApi = {
     }
   },
 
-  // Process checkout and place order
-  process: async (checkoutData: CheckoutRequest): Promise<CheckoutResponse> => {
+  // Process checkout and place order. Retries of the same attempt must
+  // reuse idempotencyKey so the server returns the original order.
+  process: async (
+    checkoutData: CheckoutRequest,
+    idempotencyKey: string
+  ): Promise<CheckoutResponse> => {
     try {
       console.log('[Checkout API] Sending request:', checkoutData);
 
       const response = await apiClient.post<CheckoutResponse>(
         '/checkout/process', // Fixed: added /process
-        checkoutData
+        checkoutData,
+        { headers: { 'Idempotency-Key': idempotencyKey } }
       );
 
       console.log('[Checkout API] Response:', response.data);
@@ -47,6 +53,19 @@ export const checkoutApi = {
     }
   },
 
+  // Poll the background processing status of a placed order
+  getOrderStatus: async (orderId: string): Promise<OrderStatus> => {
+    try {
+      const response = await apiClient.get<OrderStatus>(
+        `/checkout/orders/${encodeURIComponent(orderId)}`
+      );
+      return response.data;
+    } catch (error) {
+      console.error('Error fetching order status:', error);
+      throw error;
+    }
+  },
+
   /**
    * Validate checkout data before submission
    */
@@ -7,13 +7,32 @@ export interface CheckoutRequest {
   payment_method: string;
 }
 
+export type OrderState =
+  | 'pending'
+  | 'processing'
+  | 'retrying'
+  | 'confirmed'
+  | 'failed';
+
 export interface CheckoutResponse {
   order_id: string;
   total: number;
+  status: OrderState;
   message: string;
   estimated_delivery: string;
 }
 
+export interface OrderStatus {
+  order_id: string;
+  status: OrderState;
+  total: number;
+  item_count: number;
+  attempts: number;
+  error: string | null;
+  created_at: number;
+  updated_at: number;
+}
+
 export interface CheckoutSummary {
   items: CartItem[];
   subtotal: number;
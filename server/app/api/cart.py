@@ -1,12 +1,14 @@
 from fastapi import APIRouter, HTTPException, Header, Depends
-from typing import Optional
-from pydantic import BaseModel
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field
 from app.services.cart_service import (
     get_cart,
     add_to_cart,
     remove_from_cart,
     update_quantity,
-    clear_cart
+    apply_cart_operations,
+    clear_cart,
+    MAX_BATCH_OPERATIONS
 )
 from app.core.rate_limiter import cart_limit
 
@@ -20,6 +22,14 @@ class UpdateQuantityRequest(BaseModel):
     product_id: str
     quantity: int
 
+class CartOperation(BaseModel):
+    op: Literal["add", "remove", "set"]
+    product_id: str
+    quantity: int = 1
+
+class BatchCartRequest(BaseModel):
+    operations: List[CartOperation] = Field(..., min_length=1, max_length=MAX_BATCH_OPERATIONS)
+
 
 @router.get("/", dependencies=[Depends(cart_limit)])
 async def view_cart(session_id: Optional[str] = Header(None)):
@@ -69,6 +79,18 @@ async def remove_item_from_cart(product_id: str, session_id: Optional[str] = Hea
         raise HTTPException(status_code=500, detail=str(e))
     
 
+@router.post("/batch", dependencies=[Depends(cart_limit)])
+async def batch_update_cart(request: BatchCartRequest, session_id: Optional[str] = Header(None)):
+    """Apply several add, remove and set operations atomically."""
+    if not session_id:
+        raise HTTPException(status_code=400, detail="Missing session_id header")
+    try:
+        result = await apply_cart_operations(session_id, [op.model_dump() for op in request.operations])
+        return {"message": "Cart updated", "cart": result["cart"], "failed": result["failed"]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.delete("/clear", dependencies=[Depends(cart_limit)])
 async def clear_user_cart(session_id: Optional[str] = Header(None)):
     """Clear the entire cart."""
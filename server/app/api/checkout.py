@@ -1,9 +1,10 @@
 from fastapi import APIRouter, HTTPException, Header, Depends
 from typing import Optional
 from pydantic import BaseModel, EmailStr
-import uuid
 
-from app.services.cart_service import get_cart, clear_cart
+from app.services.cart_service import get_cart
+from app.services.checkout_service import place_order, EmptyCartError, IdempotencyKeyReusedError
+from app.services.order_service import calculate_totals, get_order_status, OrderNotFoundError
 from app.core.rate_limiter import checkout_limit, cart_limit
 
 router = APIRouter(prefix="/checkout", tags=["checkout"])
@@ -17,9 +18,20 @@ class CheckoutRequest(BaseModel):
 class CheckoutResponse(BaseModel):
     order_id: str
     total: float
+    status: str
     message: str
     estimated_delivery: str
 
+class OrderStatus(BaseModel):
+    order_id: str
+    status: str
+    total: float
+    item_count: int
+    attempts: int
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
 class CheckoutSummary(BaseModel):
     items: list
     subtotal: float
@@ -31,11 +43,15 @@ class CheckoutSummary(BaseModel):
 @router.post("/process", response_model=CheckoutResponse, dependencies=[Depends(checkout_limit)])
 async def process_checkout(
     request: CheckoutRequest, 
-    session_id: Optional[str] = Header(None)
+    session_id: Optional[str] = Header(None),
+    idempotency_key: Optional[str] = Header(None)
 ):
     """
     Process checkout for the current cart.
-    Validates cart, calculates totals, and creates order.
+    Validates cart, calculates totals, and queues the order. Payment and
+    confirmation run in the background; poll /checkout/orders/{order_id}.
+    Send the same Idempotency-Key when retrying a submit to get the
+    original order back instead of placing a second one.
     """
     if not session_id:
         raise HTTPException(
@@ -44,39 +60,22 @@ async def process_checkout(
         )
     
     try:
-        # Get cart
-        cart = await get_cart(session_id)
-        
-        if cart['item_count'] == 0:
-            raise HTTPException(
-                status_code=400, 
-                detail="Cannot checkout with empty cart"
-            )
-        
-        # Calculate totals
-        subtotal = cart['total']
-        tax = round(subtotal * 0.08, 2)  # 8% tax
-        shipping = 0.00 if subtotal >= 50 else 5.99  # Free shipping over $50
-        total = round(subtotal + tax + shipping, 2)
-        
-        # Generate order ID
-        order_id = f"ORD-{uuid.uuid4().hex[:8].upper()}"
-        
-        # In production: process payment here
-        # payment_result = process_payment(request.payment_method, total)
-        
-        # Clear cart after successful order
-        await clear_cart(session_id)
+        # Snapshots and clears the cart and queues the order atomically;
+        # the order worker handles payment, inventory and confirmation
+        order = await place_order(session_id, request.model_dump(), idempotency_key)
         
         return CheckoutResponse(
-            order_id=order_id,
-            total=total,
+            order_id=order['order_id'],
+            total=order['total'],
+            status=order['status'],
             message="Your order has been placed successfully! You'll receive a confirmation email shortly.",
             estimated_delivery="3-5 business days"
         )
         
-    except HTTPException:
-        raise
+    except IdempotencyKeyReusedError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except (EmptyCartError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500, 
@@ -105,17 +104,9 @@ async def checkout_summary(session_id: Optional[str] = Header(None)):
                 detail="Cart is empty"
             )
         
-        subtotal = cart['total']
-        tax = round(subtotal * 0.08, 2)  # 8% tax
-        shipping = 0.00 if subtotal >= 50 else 5.99  # Free shipping over $50
-        total = round(subtotal + tax + shipping, 2)
-
         return {
             "items": cart['items'],
-            "subtotal": subtotal,
-            "tax": tax,
-            "shipping": shipping,
-            "total": total,
+            **calculate_totals(cart['total']),
             "item_count": cart['item_count']
         }
         
@@ -125,4 +116,27 @@ async def checkout_summary(session_id: Optional[str] = Header(None)):
         raise HTTPException(
             status_code=500, 
             detail=f"Checkout summary error: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/orders/{order_id}", response_model=OrderStatus, dependencies=[Depends(cart_limit)])
+async def order_status(order_id: str, session_id: Optional[str] = Header(None)):
+    """
+    Get the processing status of an order placed by this session:
+    pending, processing, retrying, confirmed or failed.
+    """
+    if not session_id:
+        raise HTTPException(
+            status_code=400, 
+            detail="Missing session_id header"
+        )
+    
+    try:
+        return await get_order_status(order_id, session_id)
+    except OrderNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Order status error: {str(e)}"
+        )
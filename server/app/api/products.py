@@ -1,9 +1,21 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Optional
+import os
+import base64
+import hashlib
+from fastapi import APIRouter, HTTPException, Depends, Response, Header, Query
+from typing import List, Optional, Any, Callable, Union, Tuple
 from pydantic import BaseModel
-from app.services.product_service import get_products
+import orjson
+from app.services.catalog import Catalog, SORT_KEYS
+from app.services.product_service import get_catalog, SOFT_TTL
 from app.core.rate_limiter import product_limit
 
+HTTP_MAX_AGE = int(os.getenv("PRODUCTS_HTTP_MAX_AGE", "60"))
+# Browsers reuse responses for max-age, then may serve them stale while
+# revalidating with If-None-Match, matching the server-side soft TTL.
+CACHE_CONTROL = f"public, max-age={HTTP_MAX_AGE}, stale-while-revalidate={SOFT_TTL}"
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
 router = APIRouter(prefix="/products", tags=["products"])
 
 class Product(BaseModel):
@@ -15,55 +27,229 @@ class Product(BaseModel):
     image: str
     rating: Optional[dict] = None
 
-@router.get("/", response_model=List[Product], dependencies=[Depends(product_limit)])
-async def list_products():
-    """"Get all products."""
+
+class ProductPage(BaseModel):
+    items: List[dict]
+    next_cursor: Optional[str] = None
+    total: int
+
+class FilteredProductPage(ProductPage):
+    facets: dict
+
+
+PRODUCT_FIELDS = tuple(Product.model_fields)
+
+
+def encode_products(products: Any, fields: Tuple[str, ...] = PRODUCT_FIELDS) -> bytes:
+    """
+    Encode a product or list of products with orjson, keeping only the
+    given fields (by default those declared on Product, which is what
+    response_model would emit).
+    """
+    if isinstance(products, dict):
+        return orjson.dumps({field: products.get(field) for field in fields})
+    return orjson.dumps([{field: p.get(field) for field in fields} for p in products])
+
+
+def _encode_cursor(sort: str, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{sort}:{offset}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort: str) -> int:
+    """Decode a pagination cursor into an offset, validating it matches the sort."""
     try:
-        products = await get_products()
-        return products
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, offset = base64.urlsafe_b64decode(padded).decode().rsplit(":", 1)
+        if cursor_sort != sort or int(offset) < 0:
+            raise ValueError
+        return int(offset)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor for this sort order")
+
+
+def _parse_sort(sort: Optional[str]) -> Tuple[str, str, bool]:
+    """Parse a sort parameter into (raw sort, sort key, descending)."""
+    sort = sort or "id"
+    sort_key = sort.lstrip("-")
+    if sort_key not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"Invalid sort '{sort}'. Allowed: {', '.join(SORT_KEYS)}")
+    return sort, sort_key, sort.startswith("-")
+
+
+def _parse_fields(fields: Optional[str]) -> Tuple[str, ...]:
+    """Parse a comma-separated sparse fieldset."""
+    if not fields:
+        return PRODUCT_FIELDS
+    requested = tuple(f.strip() for f in fields.split(",") if f.strip())
+    unknown = [f for f in requested if f not in PRODUCT_FIELDS]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown) or '(none)'}. Allowed: {', '.join(PRODUCT_FIELDS)}"
+        )
+    return requested
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+def _catalog_response(
+    catalog: Catalog,
+    key: str,
+    build: Callable[[], bytes],
+    if_none_match: Optional[str],
+) -> Response:
+    """
+    Serve pre-encoded catalog bytes with ETag and Cache-Control headers,
+    or an empty 304 when the client already has this version.
+    Bypasses response_model validation.
+    """
+    return _conditional_response(catalog.get_encoded(key, build), catalog.get_etag(key, build), if_none_match)
+
+
+def _conditional_response(body: bytes, etag: str, if_none_match: Optional[str]) -> Response:
+    """Serve JSON bytes with ETag and Cache-Control, or 304 on a match."""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/", response_model=Union[List[Product], ProductPage], dependencies=[Depends(product_limit)])
+async def list_products(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: Optional[str] = Query(None, description="id, price or rating; prefix with '-' for descending"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields, e.g. id,title,price,image"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Get all products.
+    With limit, cursor, sort or fields, returns a page
+    {items, next_cursor, total} sliced from a presorted index.
+    """
+    try:
+        catalog = await get_catalog()
+        if limit is None and cursor is None and sort is None and fields is None:
+            return _catalog_response(catalog, "all", lambda: encode_products(catalog.products), if_none_match)
+        
+        sort, sort_key, descending = _parse_sort(sort)
+        projection = _parse_fields(fields)
+        page_size = limit or DEFAULT_PAGE_SIZE
+        offset = _decode_cursor(cursor, sort) if cursor else 0
+        items = catalog.page(sort_key, offset, page_size, descending)
+        next_offset = offset + len(items)
+        
+        body = orjson.dumps({
+            "items": [{field: p.get(field) for field in projection} for p in items],
+            "next_cursor": _encode_cursor(sort, next_offset) if next_offset < len(catalog) else None,
+            "total": len(catalog),
+        })
+        etag = f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+        return _conditional_response(body, etag, if_none_match)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Declared before /{product_id} so "filter" is not parsed as a product ID
+@router.get("/filter", response_model=FilteredProductPage, dependencies=[Depends(product_limit)])
+async def filter_products(
+    category: Optional[str] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    min_rating: Optional[float] = Query(None, ge=0, le=5),
+    sort: Optional[str] = Query(None, description="id, price or rating; prefix with '-' for descending"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields, e.g. id,title,price,image"),
+):
+    """
+    Filter products by category, price range and minimum rating.
+    Returns a page of matches with category, price and rating facet counts.
+    """
+    try:
+        catalog = await get_catalog()
+        sort, sort_key, descending = _parse_sort(sort)
+        projection = _parse_fields(fields)
+        offset = _decode_cursor(cursor, sort) if cursor else 0
+        
+        result = catalog.facet_index.query(category, min_price, max_price, min_rating)
+        # Filtering the presorted positions by the match bitset keeps them sorted
+        order = catalog.sort_order(sort_key)
+        matched = order[result["matched"][order]]
+        if descending:
+            matched = matched[::-1]
+        page = matched[offset:offset + limit].tolist()
+        next_offset = offset + len(page)
+        
+        return Response(
+            content=orjson.dumps({
+                "items": [{field: catalog.products[i].get(field) for field in projection} for i in page],
+                "next_cursor": _encode_cursor(sort, next_offset) if next_offset < result["total"] else None,
+                "total": result["total"],
+                "facets": result["facets"],
+            }),
+            media_type="application/json"
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.get("/{product_id}", response_model=Product, dependencies=[Depends(product_limit)])
-async def get_product_by_id(product_id: int):
+async def get_product_by_id(product_id: int, if_none_match: Optional[str] = Header(None)):
     """"Get a specific product by ID."""
     try:
-        products = await get_products()
-        product = next((p for p in products if p['id'] == product_id), None)
+        catalog = await get_catalog()
+        product = catalog.get(product_id)
         if not product:
             raise HTTPException(status_code=404, detail=f"Product {product_id} not found")
-        return product
+        return _catalog_response(catalog, f"product:{product_id}", lambda: encode_products(product), if_none_match)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.get("/category/{category_name}", response_model=List[Product], dependencies=[Depends(product_limit)])
-async def get_products_by_category(category_name: str):
+async def get_products_by_category(category_name: str, if_none_match: Optional[str] = Header(None)):
     """"Get products by category."""
     try:
-        products = await get_products()
-        filtered_products = [p for p in products if p['category'].lower() == category_name.lower()]
+        catalog = await get_catalog()
+        filtered_products = catalog.get_category(category_name)
 
         if not filtered_products:
             raise HTTPException(status_code=404, detail=f"No products found in category '{category_name}'")
     
-        return filtered_products
+        return _catalog_response(
+            catalog,
+            f"category:{category_name.lower()}",
+            lambda: encode_products(filtered_products),
+            if_none_match
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
-@router.get("/search/{query}", dependencies=[Depends(product_limit)])
-async def search_products(query: str):
-    """"Search products by title or description."""
+@router.get("/search/{query}", response_model=List[Product], dependencies=[Depends(product_limit)])
+async def search_products(query: str, limit: int = Query(20, ge=1, le=100)):
+    """"Search products by title, category or description, best matches first."""
     try:
-        products = await get_products()
-        query_lower = query.lower()
-        matched_products = [
-            p for p in products 
-            if query_lower in p['title'].lower() or query_lower in p['description'].lower()
-        ]
+        catalog = await get_catalog()
+        matched_products = catalog.search_index.search(query, limit)
         
         if not matched_products:
             raise HTTPException(status_code=404, detail=f"No products matched the query '{query}'")
         
-        return matched_products
+        return Response(content=encode_products(matched_products), media_type="application/json")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,88 @@
+import time
+from typing import Optional, Dict, Any
+from app.core.logging_config import log_info, log_warning
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker for an upstream dependency.
+    After failure_threshold consecutive failures the circuit opens and
+    callers are rejected without touching the upstream. Once
+    recovery_timeout has passed a single probe call is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._stats = {"trips": 0, "rejected": 0, "successes": 0, "failures": 0}
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call to the upstream may go ahead.
+        Returns:
+            bool: False if the circuit is open (or a half-open probe is already running)
+        """
+        if self.state == OPEN and time.time() - (self.opened_at or 0) >= self.recovery_timeout:
+            self.state = HALF_OPEN
+            self._probe_in_flight = False
+            log_info("Circuit breaker half-open - probing upstream", breaker=self.name)
+
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+
+        self._stats["rejected"] += 1
+        return False
+
+    def record_success(self):
+        """Record a successful upstream call, closing the circuit if it was probing."""
+        self._stats["successes"] += 1
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            log_info("Circuit breaker closed - upstream recovered", breaker=self.name)
+        self.state = CLOSED
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        """Record a failed upstream call, opening the circuit past the threshold."""
+        self._stats["failures"] += 1
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self._stats["trips"] += 1
+                log_warning(
+                    "Circuit breaker opened",
+                    breaker=self.name,
+                    consecutive_failures=self.consecutive_failures,
+                    retry_in=f"{self.recovery_timeout}s"
+                )
+            self.state = OPEN
+            self.opened_at = time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get breaker state and counters."""
+        retry_in = None
+        if self.state == OPEN and self.opened_at is not None:
+            retry_in = round(max(self.recovery_timeout - (time.time() - self.opened_at), 0.0), 2)
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in": retry_in,
+            **self._stats,
+        }
@@ -0,0 +1,175 @@
+import os
+import time
+import random
+import asyncio
+from typing import Optional, Dict, Any
+import httpx
+from app.core.logging_config import log_performance, log_error, log_info, log_warning
+
+
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "10.0"))
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "20"))
+UPSTREAM_MAX_KEEPALIVE = int(os.getenv("UPSTREAM_MAX_KEEPALIVE", "10"))
+UPSTREAM_KEEPALIVE_EXPIRY = float(os.getenv("UPSTREAM_KEEPALIVE_EXPIRY", "30.0"))
+UPSTREAM_HTTP2 = os.getenv("UPSTREAM_HTTP2", "false").lower() == "true"
+UPSTREAM_MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", "3"))
+UPSTREAM_BACKOFF_BASE = float(os.getenv("UPSTREAM_BACKOFF_BASE", "0.25"))
+UPSTREAM_BACKOFF_MAX = float(os.getenv("UPSTREAM_BACKOFF_MAX", "4.0"))
+# Wall-clock cap on one get_with_retry call, attempts and backoff included.
+# The catalog refresh lock and peer wait are sized from it.
+UPSTREAM_RETRY_BUDGET = float(os.getenv("UPSTREAM_RETRY_BUDGET", str(UPSTREAM_TIMEOUT)))
+
+# Status codes worth retrying; anything else is returned to the caller
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "application/json",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+_http_client: Optional[httpx.AsyncClient] = None
+_upstream_stats: Dict[str, Any] = {
+    "requests": 0,
+    "attempts": 0,
+    "retries": 0,
+    "failures": 0,
+    "last_attempt_latency": None,
+    "total_attempt_latency": 0.0,
+}
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get or create the shared upstream HTTP client singleton."""
+    global _http_client
+    if _http_client is None:
+        http2 = UPSTREAM_HTTP2 and _http2_available()
+        if UPSTREAM_HTTP2 and not http2:
+            log_warning("UPSTREAM_HTTP2 is set but the h2 package is not installed - using HTTP/1.1")
+
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(UPSTREAM_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=UPSTREAM_MAX_CONNECTIONS,
+                max_keepalive_connections=UPSTREAM_MAX_KEEPALIVE,
+                keepalive_expiry=UPSTREAM_KEEPALIVE_EXPIRY,
+            ),
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+            http2=http2,
+        )
+        log_info(
+            "Upstream HTTP client initialized",
+            max_connections=UPSTREAM_MAX_CONNECTIONS,
+            keepalive=UPSTREAM_MAX_KEEPALIVE,
+            http2=http2
+        )
+    return _http_client
+
+
+async def init_http_client():
+    """Create the shared upstream HTTP client. Call this in app startup."""
+    get_http_client()
+
+
+async def close_http_client():
+    """Close the shared upstream HTTP client and its pooled connections."""
+    global _http_client
+    if _http_client:
+        try:
+            await _http_client.aclose()
+            _http_client = None
+            log_info("Upstream HTTP client closed successfully")
+        except Exception as e:
+            log_error(e, "Error closing upstream HTTP client")
+
+
+def _backoff_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Full-jitter exponential backoff, honouring a numeric Retry-After header."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(float(retry_after), UPSTREAM_BACKOFF_MAX)
+    return random.uniform(0, min(UPSTREAM_BACKOFF_MAX, UPSTREAM_BACKOFF_BASE * (2 ** attempt)))
+
+
+async def get_with_retry(url: str, **kwargs) -> httpx.Response:
+    """
+    GET an upstream URL with the shared client, retrying transient errors.
+    Retries timeouts, transport errors and RETRY_STATUS_CODES with jittered
+    exponential backoff, and records per-attempt latency. The whole call,
+    backoff included, stays within UPSTREAM_RETRY_BUDGET: each attempt's
+    timeout is cut to the time left, and no retry starts past the budget.
+    Args:
+        url: URL to fetch
+        **kwargs: Extra arguments for httpx.AsyncClient.get
+    Returns:
+        httpx.Response: Final response (may still be an error status)
+    Raises:
+        httpx.TimeoutException, httpx.TransportError: If every attempt fails
+    """
+    client = get_http_client()
+    _upstream_stats["requests"] += 1
+    deadline = time.time() + UPSTREAM_RETRY_BUDGET
+
+    for attempt in range(UPSTREAM_MAX_RETRIES + 1):
+        start_time = time.time()
+        _upstream_stats["attempts"] += 1
+        timeout = min(UPSTREAM_TIMEOUT, max(deadline - start_time, 0.1))
+        try:
+            response = await client.get(url, **{"timeout": timeout, **kwargs})
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            duration = time.time() - start_time
+            _record_attempt(duration)
+            log_performance("upstream_attempt", duration, url=url, attempt=attempt + 1, status=type(e).__name__)
+            delay = _backoff_delay(attempt)
+            if attempt == UPSTREAM_MAX_RETRIES or time.time() + delay >= deadline:
+                _upstream_stats["failures"] += 1
+                raise
+        else:
+            duration = time.time() - start_time
+            _record_attempt(duration)
+            log_performance(
+                "upstream_attempt",
+                duration,
+                url=url,
+                attempt=attempt + 1,
+                status_code=response.status_code,
+                bytes=len(response.content)
+            )
+            delay = _backoff_delay(attempt, response)
+            if (response.status_code not in RETRY_STATUS_CODES or attempt == UPSTREAM_MAX_RETRIES
+                    or time.time() + delay >= deadline):
+                if response.is_error:
+                    _upstream_stats["failures"] += 1
+                return response
+
+        _upstream_stats["retries"] += 1
+        log_warning("Retrying upstream request", url=url, attempt=attempt + 1, delay=f"{delay:.2f}s")
+        await asyncio.sleep(delay)
+
+    raise RuntimeError("unreachable")  # pragma: no cover
+
+
+def _record_attempt(duration: float):
+    _upstream_stats["last_attempt_latency"] = round(duration, 4)
+    _upstream_stats["total_attempt_latency"] += duration
+
+
+def get_upstream_stats() -> Dict[str, Any]:
+    """Get upstream request, retry and latency counters."""
+    attempts = _upstream_stats["attempts"]
+    return {
+        **_upstream_stats,
+        "total_attempt_latency": round(_upstream_stats["total_attempt_latency"], 4),
+        "avg_attempt_latency": round(_upstream_stats["total_attempt_latency"] / attempts, 4) if attempts else None,
+    }
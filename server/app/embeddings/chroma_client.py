@@ -47,6 +47,15 @@ def get_chroma_client():
     return _collection
 
 
+def get_max_batch_size() -> int:
+    """
+    Get the largest number of records ChromaDB accepts in one add or upsert.
+    Returns:
+        int: Maximum batch size
+    """
+    return initialize_chroma().get_max_batch_size()
+
+
 def search_similar(query_embedding: list, n_results: int = 5, filter_dict: dict | None = None):
     """
     Search for similar items in ChromaDB using embedding.
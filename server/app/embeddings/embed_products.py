@@ -1,33 +1,26 @@
-import os
-from typing import List, Dict, Any
+import asyncio
+import json
+import time
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple
 from app.services.product_service import get_products
 from app.data.shophub_data import SHOPHUB_INFO
-from app.embeddings.chroma_client import get_chroma_client
-from app.services.product_service import clear_cache
-from huggingface_hub import InferenceClient
+from app.embeddings.chroma_client import get_chroma_client, get_max_batch_size
+from app.core.logging_config import log_performance, log_warning
+from app.embeddings.embedding_backends import get_embedding_backend, embedding_identity
 
 
-client = InferenceClient(token=os.getenv("HF_TOKEN"))
-
 def create_embeddings(texts: List[str]) -> List[List[float]]:
-    """Generate embeddings using HuggingFace Inference API"""
-    embeddings = []
+    """
+    Generate embeddings with the configured backend (EMBEDDING_BACKEND).
+    Args:
+        texts: Texts to embed
+    Returns:
+        List[List[float]]: One embedding per text, in order
+    """
+    return get_embedding_backend().embed(texts)
 
-    for text in texts:
-        response = client.feature_extraction(
-            text=text,
-            model="sentence-transformers/all-MiniLM-L6-v2"
-        )
-        # HuggingFace returns shape (sequence_length, embedding_dim)
-        # We need mean pooling to get single vector per text
-        if isinstance(response[0], list):
-            # Mean pooling across sequence
-            embedding = [sum(col)/len(col) for col in zip(*response)]
-        else:
-            embedding = response
-        embeddings.append(embedding)
-   
-    return embeddings
+_sync_lock = asyncio.Lock()
 
 def create_product_document(product: Dict[str, Any]) -> str:
     """
@@ -46,29 +39,21 @@ def create_product_document(product: Dict[str, Any]) -> str:
     document = f"Product: {title}. Category: {category}. Description: {description}. Price: ${price}"
     return document
 
-async def embed_and_store_products():
-    """Fetch products, create documents, generate embeddings, and store them.
-    Also embed SHOPHUB information.
-    """
-    products = await get_products()
-    if not products:
-        print("No products found to embed.")
-        return
-    
-    collection = get_chroma_client()
+def _content_hash(document: str, metadata: Dict[str, Any]) -> str:
+    """Hash of everything stored for a document, used to detect changes."""
+    payload = json.dumps([document, metadata], sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
 
-    # Clear existing data to avoid duplicate IDs
-    try:
-        existing_count = collection.count()
-        if existing_count > 0:
-            print(f"Clearing {existing_count} existing documents from collection...")
-            existing_data = collection.get()
-            if existing_data and existing_data['ids']:
-                collection.delete(ids=existing_data['ids'])
-            print("Collection cleared")
-    except Exception as e:
-        print(f"Error clearing collection: {e}")
 
+def build_documents(products: List[Dict[str, Any]]) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
+    """
+    Build the Chroma ids, documents and metadata for products and SHOPHUB info.
+    Each metadata carries a content_hash of its document and fields.
+    Args:
+        products: Product dictionaries from the API
+    Returns:
+        Tuple[List[str], List[str], List[Dict[str, Any]]]: ids, documents and metadatas
+    """
     documents = []
     metadatas = []
     ids = []
@@ -119,26 +104,164 @@ async def embed_and_store_products():
         })
         ids.append(f"hub_info_faq_{topic}")
 
-    # Generate embeddings using HuggingFace API
+    for document, metadata in zip(documents, metadatas):
+        metadata['content_hash'] = _content_hash(document, metadata)
+
+    return ids, documents, metadatas
+
+def _record_embedding_model(collection):
+    """
+    Record the backend and model the collection's vectors come from, so a
+    switch (EMBEDDING_BACKEND) is detected and everything re-embedded.
+    """
+    collection.modify(metadata={**(collection.metadata or {}), 'embedding_model': embedding_identity()})
+
+def _write_batches(write, ids, documents, metadatas, embeddings):
+    """Call collection.add/upsert in chunks no larger than ChromaDB's batch limit."""
+    batch_size = get_max_batch_size()
+    for start in range(0, len(ids), batch_size):
+        end = start + batch_size
+        write(
+            embeddings=embeddings[start:end],
+            documents=documents[start:end],
+            metadatas=metadatas[start:end],
+            ids=ids[start:end]
+        )
+
+def _delete_batches(collection, ids):
+    """Delete ids in chunks no larger than ChromaDB's batch limit."""
+    batch_size = get_max_batch_size()
+    for start in range(0, len(ids), batch_size):
+        collection.delete(ids=ids[start:start + batch_size])
+
+async def embed_and_store_products():
+    """Fetch products, create documents, generate embeddings, and store them.
+    Also embed SHOPHUB information.
+    """
+    products = await get_products()
+    if not products:
+        print("No products found to embed.")
+        return
+    
+    collection = get_chroma_client()
+
+    # Clear existing data to avoid duplicate IDs
+    try:
+        existing_count = collection.count()
+        if existing_count > 0:
+            print(f"Clearing {existing_count} existing documents from collection...")
+            existing_data = collection.get(include=[])
+            if existing_data and existing_data['ids']:
+                _delete_batches(collection, existing_data['ids'])
+            print("Collection cleared")
+    except Exception as e:
+        print(f"Error clearing collection: {e}")
+
+    ids, documents, metadatas = build_documents(products)
+
+    # Generate embeddings off the event loop (local inference is CPU-bound)
     print(f"Generating embeddings for {len(documents)} documents (products + shophub info)...")
-    embeddings = create_embeddings(documents)
+    embeddings = await asyncio.to_thread(create_embeddings, documents)
 
     # Store embeddings in ChromaDB
-    collection.add(
-        embeddings=embeddings, # type: ignore
-        documents=documents,
-        metadatas=metadatas,
-        ids=ids
-    )
+    _write_batches(collection.add, ids, documents, metadatas, embeddings)
+    _record_embedding_model(collection)
     
-    print(f"Successfully embedded and stored {len(products)} products and {len(faqs_dict) + 1} shophub documents in ChromaDB")
+    print(f"Successfully embedded and stored {len(products)} products and {len(documents) - len(products)} shophub documents in ChromaDB")
 
-async def refresh_embedddings():
+async def sync_embeddings(
+    force_refresh: bool = False, products: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, int]:
     """
-    Force refresh products and recreate embeddings.
+    Bring the collection in line with the current catalog (see
+    _sync_embeddings). Concurrent calls run one after another.
+    Args:
+        force_refresh: If True, fetch fresh products from the API first
+        products: Catalog to sync; fetched with get_products when None
+    Returns:
+        Dict[str, int]: Counts of added, updated, deleted and unchanged documents
+    """
+    async with _sync_lock:
+        return await _sync_embeddings(force_refresh, products)
+
+async def _sync_embeddings(force_refresh: bool, products: Optional[List[Dict[str, Any]]]) -> Dict[str, int]:
+    """
+    Bring the collection in line with the current catalog, re-embedding
+    only new or changed documents and deleting removed ones.
+    Changes are detected by comparing the content_hash stored in each
+    document's metadata; documents without one count as changed. If the
+    collection was embedded with another backend or model, every
+    document counts as changed.
+    Args:
+        force_refresh: If True, fetch fresh products from the API first
+        products: Catalog to sync; fetched with get_products when None
+    Returns:
+        Dict[str, int]: Counts of added, updated, deleted and unchanged documents
     """
-    await clear_cache()
+    start_time = time.time()
+    if products is None:
+        products = await get_products(force_refresh=force_refresh)
+    if not products:
+        print("No products found to sync.")
+        return {"added": 0, "updated": 0, "deleted": 0, "unchanged": 0}
+
+    collection = get_chroma_client()
+    ids, documents, metadatas = build_documents(products)
 
-    # Re-embed products and store
-    await embed_and_store_products()
-    print("Product embeddings refreshed successfully.")
\ No newline at end of file
+    existing = collection.get(include=["metadatas"]) # type: ignore
+    stored_hashes = {
+        doc_id: (metadata or {}).get('content_hash')
+        for doc_id, metadata in zip(existing['ids'], existing['metadatas'] or [])
+    }
+
+    # Vectors from different models are not comparable; never mix them
+    stored_model = (collection.metadata or {}).get('embedding_model')
+    model_changed = stored_model != embedding_identity()
+    if model_changed:
+        log_warning("Embedding model changed - re-embedding all documents",
+                    stored=stored_model, current=embedding_identity())
+
+    changed = [
+        i for i, doc_id in enumerate(ids)
+        if model_changed or stored_hashes.get(doc_id) != metadatas[i]['content_hash']
+    ]
+    current_ids = set(ids)
+    removed = [doc_id for doc_id in stored_hashes if doc_id not in current_ids]
+
+    if changed:
+        print(f"Generating embeddings for {len(changed)} changed documents...")
+        changed_documents = [documents[i] for i in changed]
+        _write_batches(
+            collection.upsert,
+            [ids[i] for i in changed],
+            changed_documents,
+            [metadatas[i] for i in changed],
+            await asyncio.to_thread(create_embeddings, changed_documents)
+        )
+    if removed:
+        _delete_batches(collection, removed)
+    if model_changed:
+        _record_embedding_model(collection)
+
+    added = sum(1 for i in changed if ids[i] not in stored_hashes)
+    counts = {
+        "added": added,
+        "updated": len(changed) - added,
+        "deleted": len(removed),
+        "unchanged": len(ids) - len(changed),
+    }
+    log_performance("sync_embeddings", time.time() - start_time, **counts)
+    print(f"Embeddings synced: {counts}")
+    return counts
+
+async def refresh_embeddings() -> Dict[str, int]:
+    """
+    Refresh products from the API and sync their embeddings.
+    Returns:
+        Dict[str, int]: Counts of added, updated, deleted and unchanged documents
+    """
+    # Force refresh replaces the cached catalog in place, so it is never
+    # emptied and a failed upstream keeps serving the last known good copy
+    counts = await sync_embeddings(force_refresh=True)
+    print("Product embeddings refreshed successfully.")
+    return counts
@@ -0,0 +1,171 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+import time
+from typing import Any, List, Optional
+import numpy as np
+from app.core.logging_config import log_info, log_performance, log_warning
+
+try:
+    import onnxruntime
+    from tokenizers import Tokenizer
+except ImportError:  # optional dependencies
+    onnxruntime = None
+    Tokenizer = None
+
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# "onnx": run the model locally; "hf": HuggingFace Inference API (needs HF_TOKEN)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "onnx").lower()
+BACKENDS = ("onnx", "hf")
+if EMBEDDING_BACKEND not in BACKENDS:
+    log_warning("Unknown EMBEDDING_BACKEND - using onnx", backend=EMBEDDING_BACKEND)
+    EMBEDDING_BACKEND = "onnx"
+elif EMBEDDING_BACKEND == "onnx" and onnxruntime is None:
+    log_warning("EMBEDDING_BACKEND=onnx but onnxruntime/tokenizers are not installed - using hf")
+    EMBEDDING_BACKEND = "hf"
+# Directory holding model.onnx and tokenizer.json; empty downloads them from the Hub
+EMBEDDING_MODEL_DIR = os.getenv("EMBEDDING_MODEL_DIR", "")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+# 0 lets onnxruntime pick the thread count
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))
+# all-MiniLM-L6-v2 was trained on up to 256 tokens
+MAX_SEQUENCE_LENGTH = 256
+
+_backend: Optional["EmbeddingBackend"] = None
+_backend_lock = threading.Lock()
+
+
+def mean_pool(token_embeddings: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+    """
+    Average token embeddings over the real (unpadded) tokens and
+    L2-normalize, as sentence-transformers does for this model.
+    Args:
+        token_embeddings: (batch, tokens, dim) model output
+        attention_mask: (batch, tokens) 1 for real tokens, 0 for padding
+    Returns:
+        np.ndarray: (batch, dim) float32 sentence embeddings
+    """
+    mask = attention_mask[..., np.newaxis].astype(np.float32)
+    summed = (token_embeddings * mask).sum(axis=1)
+    pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+    norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+    return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
+class EmbeddingBackend(ABC):
+    """Turns texts into sentence embeddings."""
+
+    name = ""
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts.
+        Args:
+            texts: Texts to embed
+        Returns:
+            List[List[float]]: One embedding per text, in order
+        """
+
+
+class OnnxBackend(EmbeddingBackend):
+    """
+    Runs the model in-process with onnxruntime, in padded batches of
+    EMBEDDING_BATCH_SIZE. Texts are sorted by length before batching so
+    each batch pads to similar lengths, then returned in input order.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_dir: str = EMBEDDING_MODEL_DIR):
+        start_time = time.time()
+        if model_dir:
+            model_path = os.path.join(model_dir, "model.onnx")
+            tokenizer_path = os.path.join(model_dir, "tokenizer.json")
+        else:
+            from huggingface_hub import hf_hub_download
+            model_path = hf_hub_download(EMBEDDING_MODEL, "onnx/model.onnx")
+            tokenizer_path = hf_hub_download(EMBEDDING_MODEL, "tokenizer.json")
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_truncation(max_length=MAX_SEQUENCE_LENGTH)
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        if EMBEDDING_THREADS:
+            options.intra_op_num_threads = EMBEDDING_THREADS
+        self.session = onnxruntime.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+        log_performance("embedding_model_load", time.time() - start_time, backend=self.name)
+        log_info("ONNX embedding model loaded", model=EMBEDDING_MODEL, path=model_path)
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        # Some exports take no token_type_ids
+        token_embeddings = self.session.run(
+            None, {name: value for name, value in inputs.items() if name in self.input_names}
+        )[0]
+        return mean_pool(token_embeddings, inputs["attention_mask"])
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        start_time = time.time()
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        pooled = np.concatenate([
+            self._embed_batch([texts[i] for i in order[start:start + EMBEDDING_BATCH_SIZE]])
+            for start in range(0, len(order), EMBEDDING_BATCH_SIZE)
+        ])
+        vectors = np.empty_like(pooled)
+        vectors[order] = pooled
+
+        log_performance("create_embeddings", time.time() - start_time, backend=self.name, count=len(texts))
+        return vectors.tolist()
+
+
+class HFInferenceBackend(EmbeddingBackend):
+    """HuggingFace Inference API, one request per text."""
+
+    name = "hf"
+
+    def __init__(self):
+        from huggingface_hub import InferenceClient
+        self.client = InferenceClient(token=os.getenv("HF_TOKEN"))
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        start_time = time.time()
+        embeddings = []
+        for text in texts:
+            response: Any = np.asarray(self.client.feature_extraction(text=text, model=EMBEDDING_MODEL))
+            # Token-level output (tokens, dim) is mean pooled to one vector
+            embeddings.append((response.mean(axis=0) if response.ndim == 2 else response).tolist())
+
+        log_performance("create_embeddings", time.time() - start_time, backend=self.name, count=len(texts))
+        return embeddings
+
+
+def get_embedding_backend() -> EmbeddingBackend:
+    """Get or create the EMBEDDING_BACKEND singleton (loading the model on first use)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = OnnxBackend() if EMBEDDING_BACKEND == "onnx" else HFInferenceBackend()
+    return _backend
+
+
+def embedding_identity() -> str:
+    """
+    Backend and model in use, without loading the model. Recorded on the
+    collection so vectors from another backend or model are not mixed.
+    """
+    return f"{EMBEDDING_BACKEND}:{EMBEDDING_MODEL}"
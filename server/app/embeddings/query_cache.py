@@ -0,0 +1,152 @@
+import os
+import asyncio
+import hashlib
+import struct
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from redis.exceptions import RedisError
+from app.services.product_service import get_redis_binary_client
+from app.embeddings.embed_products import create_embeddings
+from app.embeddings.embedding_backends import embedding_identity
+from app.core.logging_config import log_performance, log_warning
+
+# Query text -> embedding, cached in-process (LRU) and in Redis so repeated
+# chatbot searches skip the embedding call. Redis values are packed
+# little-endian float32 vectors under embedding:query:<model>:<text hash>.
+QUERY_CACHE_KEY_PREFIX = "embedding:query:"
+# Cached keys by insertion time, used to cap the number of Redis entries
+QUERY_CACHE_INDEX_KEY = "embedding:query:index"
+QUERY_CACHE_TTL = int(os.getenv("QUERY_EMBEDDING_CACHE_TTL", "604800"))
+QUERY_CACHE_LOCAL_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
+QUERY_CACHE_REDIS_MAX_ENTRIES = int(os.getenv("QUERY_EMBEDDING_REDIS_MAX_ENTRIES", "50000"))
+# Longer queries are embedded but not cached; they rarely repeat
+MAX_CACHED_QUERY_LENGTH = 256
+# Vectors from another backend or model are not comparable, so it is part of the key
+_MODEL_TAG = hashlib.sha1(embedding_identity().encode("utf-8")).hexdigest()[:8]
+
+_local_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+_cache_stats: Dict[str, int] = {
+    "local_hits": 0,
+    "redis_hits": 0,
+    "misses": 0,
+    "redis_errors": 0,
+    "evicted": 0,
+}
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase and collapse whitespace so trivially different queries share an entry."""
+    return " ".join(text.lower().split())
+
+
+def pack_vector(vector: List[float]) -> bytes:
+    """Pack an embedding as little-endian float32 bytes."""
+    return struct.pack(f"<{len(vector)}f", *vector)
+
+
+def unpack_vector(data: bytes) -> List[float]:
+    """Unpack float32 bytes written by pack_vector."""
+    return list(struct.unpack(f"<{len(data) // 4}f", data))
+
+
+def _cache_key(query: str) -> str:
+    digest = hashlib.sha1(query.encode("utf-8")).hexdigest()
+    return f"{QUERY_CACHE_KEY_PREFIX}{_MODEL_TAG}:{digest}"
+
+
+def _remember(key: str, vector: List[float]):
+    """Add to the in-process LRU, evicting the least recently used entries."""
+    _local_cache[key] = vector
+    _local_cache.move_to_end(key)
+    while len(_local_cache) > QUERY_CACHE_LOCAL_SIZE:
+        _local_cache.popitem(last=False)
+
+
+async def _store(redis: Any, key: str, vector: List[float]):
+    """Write an entry to Redis and trim the oldest entries past the cap."""
+    now = time.time()
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.set(key, pack_vector(vector), ex=QUERY_CACHE_TTL)
+        pipe.zadd(QUERY_CACHE_INDEX_KEY, {key: now})
+        # Entries past their TTL have already expired
+        pipe.zremrangebyscore(QUERY_CACHE_INDEX_KEY, "-inf", now - QUERY_CACHE_TTL)
+        pipe.expire(QUERY_CACHE_INDEX_KEY, QUERY_CACHE_TTL)
+        pipe.zcard(QUERY_CACHE_INDEX_KEY)
+        *_, size = await pipe.execute()
+
+    overflow = size - QUERY_CACHE_REDIS_MAX_ENTRIES
+    if overflow > 0:
+        evicted = [member for member, _ in await redis.zpopmin(QUERY_CACHE_INDEX_KEY, overflow)]
+        if evicted:
+            await redis.delete(*evicted)
+            _cache_stats["evicted"] += len(evicted)
+
+
+async def get_query_embedding(text: str) -> List[float]:
+    """
+    Get the embedding for a search query, from the in-process cache, then
+    Redis, then the embedding backend. Redis errors fall through to
+    computing the embedding.
+    Args:
+        text: User's query
+    Returns:
+        List[float]: Embedding of the normalized query
+    """
+    start_time = time.time()
+    query = normalize_query(text)
+    if len(query) > MAX_CACHED_QUERY_LENGTH:
+        _cache_stats["misses"] += 1
+        return (await asyncio.to_thread(create_embeddings, [query]))[0]
+
+    key = _cache_key(query)
+    vector = _local_cache.get(key)
+    if vector is not None:
+        _local_cache.move_to_end(key)
+        _cache_stats["local_hits"] += 1
+        return vector
+
+    redis: Optional[Any] = None
+    try:
+        redis = await get_redis_binary_client()
+        data = await redis.get(key)
+        if data:
+            vector = unpack_vector(data)
+            _remember(key, vector)
+            _cache_stats["redis_hits"] += 1
+            log_performance("query_embedding", time.time() - start_time, source="redis")
+            return vector
+    except RedisError as e:
+        _cache_stats["redis_errors"] += 1
+        log_warning("Query embedding cache unavailable", error=str(e))
+        redis = None
+
+    _cache_stats["misses"] += 1
+    # The embedding call blocks; keep it off the event loop
+    vector = (await asyncio.to_thread(create_embeddings, [query]))[0]
+    _remember(key, vector)
+    if redis is not None:
+        try:
+            await _store(redis, key, vector)
+        except RedisError as e:
+            _cache_stats["redis_errors"] += 1
+            log_warning("Failed to cache query embedding", error=str(e))
+
+    log_performance("query_embedding", time.time() - start_time, source="backend")
+    return vector
+
+
+def clear_local_cache():
+    """Drop the in-process entries (Redis entries expire on their own)."""
+    _local_cache.clear()
+
+
+def get_query_cache_stats() -> Dict[str, Any]:
+    """Get this process's query embedding cache counters and hit rate."""
+    lookups = _cache_stats["local_hits"] + _cache_stats["redis_hits"] + _cache_stats["misses"]
+    hits = _cache_stats["local_hits"] + _cache_stats["redis_hits"]
+    return {
+        **_cache_stats,
+        "local_size": len(_local_cache),
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+    }
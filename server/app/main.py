@@ -11,18 +11,29 @@ else:
     print(f"Loading development environment from .env")
 
 from app.core.logging_config import log_error, log_info, log_warning
-from app.services.product_service import close_redis
+from app.services.product_service import close_redis, load_catalog_snapshot, on_catalog_change
+from app.core.http_client import init_http_client, close_http_client, get_upstream_stats
+from app.services.cart_reaper import start_cart_reaper, stop_cart_reaper, get_cart_reaper_stats
+from app.services.order_worker import start_order_worker, stop_order_worker, get_order_worker_stats
+from app.embeddings.query_cache import get_query_cache_stats
 import time
 import uvicorn
+from typing import Any, Dict, List
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.api import api_router
-from app.embeddings.embed_products import embed_and_store_products
+from app.embeddings.embed_products import embed_and_store_products, sync_embeddings
 from app.embeddings.chroma_client import get_collection_count
 from app.core.rate_limiter import init_limiter
 
 
+async def _sync_embeddings_on_change(products: List[Dict[str, Any]], version: str):
+    """Re-embed changed documents after a refresh changed the catalog."""
+    log_info("Catalog changed - syncing embeddings", version=version)
+    await sync_embeddings(products=products)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events for the application."""
@@ -57,6 +68,14 @@ async def lifespan(app: FastAPI):
         log_error(e, "Failed to initialize rate limiter")
         raise
 
+    # Shared upstream HTTP client (pooled keep-alive connections)
+    await init_http_client()
+
+    # Serve the last good catalog from disk straight away; the upstream
+    # is reconciled in the background
+    if await load_catalog_snapshot():
+        log_info("Catalog loaded from local snapshot")
+
     # Initialize ChromaDB and embeddings
     try:
         count = get_collection_count()
@@ -69,6 +88,9 @@ async def lifespan(app: FastAPI):
                 log_warning("No products were embedded. Check external API connectivity.")
         else:
             log_info("Found existing documents in ChromaDB", count=count)
+            # Re-embed only what changed in the catalog since the last run
+            await sync_embeddings()
+            count = get_collection_count()
         
         log_info("ChromaDB ready", document_count=count)
     except Exception as e:
@@ -78,6 +100,15 @@ async def lifespan(app: FastAPI):
         else:
             log_warning("Continuing startup despite embedding error (development mode)")
     
+    # Keep embeddings in step with catalog refreshes after startup
+    on_catalog_change(_sync_embeddings_on_change)
+
+    # Cap and count idle carts in the background
+    start_cart_reaper()
+
+    # Process queued orders (payment, inventory, confirmation)
+    start_order_worker()
+
     startup_duration = time.time() - startup_time
     log_info("Startup complete", 
              duration=f"{startup_duration:.2f}s",
@@ -86,7 +117,10 @@ async def lifespan(app: FastAPI):
     yield
 
     log_info("Shutting down ShopHub API")
+    await stop_cart_reaper()
+    await stop_order_worker()
     await close_redis()
+    await close_http_client()
     log_info("Shutdown complete")
 
 
@@ -116,7 +150,8 @@ app.add_middleware(
     allow_origins=allowed_origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Content-Type", "session-id", "Authorization"],
+    allow_headers=["Content-Type", "session-id", "Idempotency-Key", "Authorization", "If-None-Match"],
+    expose_headers=["ETag"],
 )
 
 log_info(f"CORS configured for {ENVIRONMENT}", allowed_origins=allowed_origins)
@@ -145,16 +180,22 @@ async def health_check():
         count = get_collection_count()
         
         # Check Redis connectivity
-        from app.services.product_service import get_redis_client
+        from app.services.product_service import get_redis_client, get_fetch_stats, get_breaker_stats
         redis = await get_redis_client()
-        redis_healthy =  redis.ping()
+        redis_healthy = await redis.ping()
         
         return {
             "status": "healthy",
             "environment": ENVIRONMENT,
             "database": "connected",
             "documents_count": count,
-            "redis": "connected" if redis_healthy else "disconnected"
+            "redis": "connected" if redis_healthy else "disconnected",
+            "catalog_fetch": get_fetch_stats(),
+            "upstream": get_upstream_stats(),
+            "upstream_breaker": get_breaker_stats(),
+            "carts": await get_cart_reaper_stats(),
+            "order_worker": get_order_worker_stats(),
+            "query_embeddings": get_query_cache_stats()
         }
     except Exception as e:
         log_error(e, "Health check failed")
@@ -0,0 +1,140 @@
+import os
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+from redis.exceptions import RedisError
+from app.services.product_service import get_redis_client
+from app.services.cart_service import CART_KEY, CART_TTL
+from app.core.logging_config import log_performance, log_error, log_info
+
+# Carts expire on their own once idle for CART_TTL (sliding expiry). The
+# reaper catches the ones that would not: carts written without an expiry
+# or under the old one-year TTL. It also reports how many carts there are
+# and how much memory they use.
+CART_REAPER_INTERVAL = int(os.getenv("CART_REAPER_INTERVAL", "3600"))  # seconds, 0 disables
+CART_REAPER_SCAN_COUNT = int(os.getenv("CART_REAPER_SCAN_COUNT", "500"))
+# One pass per interval across all workers
+REAPER_LOCK_KEY = "lock:cart_reaper"
+# Written by whichever worker ran the last pass, so every worker can report it
+REAPER_REPORT_KEY = "cart_reaper:last_pass"
+REPORT_INT_FIELDS = ("carts", "bytes", "avg_bytes", "deleted", "capped")
+
+_reaper_task: Optional["asyncio.Task[None]"] = None
+
+
+def _value(result: Any) -> Optional[int]:
+    """Pipeline result as an int, or None if the command failed or returned nothing."""
+    return None if result is None or isinstance(result, Exception) else int(result)
+
+
+async def reap_carts() -> Dict[str, Any]:
+    """
+    Walk every cart with SCAN, inspecting TTL, idle time and memory in one
+    pipelined round trip per batch. Carts idle longer than CART_TTL are
+    deleted; carts with no expiry or one longer than CART_TTL are capped
+    to CART_TTL.
+    None of the inspecting commands count as an access, so they do not
+    reset idle times.
+    Returns:
+        dict: carts, bytes, avg_bytes, deleted, capped and duration_ms
+    """
+    start_time = time.time()
+    redis = await get_redis_client()
+    report = {"carts": 0, "bytes": 0, "deleted": 0, "capped": 0}
+
+    cursor = 0
+    while True:
+        cursor, keys = await redis.scan(cursor, match=f"{CART_KEY}*", count=CART_REAPER_SCAN_COUNT)
+        if keys:
+            await _reap_batch(redis, keys, report)
+        if cursor == 0:
+            break
+
+    duration = time.time() - start_time
+    report["avg_bytes"] = report["bytes"] // report["carts"] if report["carts"] else 0
+    report["duration_ms"] = round(duration * 1000, 1)
+    log_performance("cart_reaper", duration, **report)
+    return report
+
+
+async def _reap_batch(redis: Any, keys: List[str], report: Dict[str, int]):
+    """Inspect one SCAN batch and queue deletes and expiry caps for it."""
+    async with redis.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.ttl(key)
+            # OBJECT IDLETIME is unavailable under LFU eviction policies and
+            # MEMORY USAGE on some managed Redis; both just read as unknown
+            pipe.object("idletime", key)
+            pipe.memory_usage(key)
+        results = await pipe.execute(raise_on_error=False)
+
+    async with redis.pipeline(transaction=False) as pipe:
+        for i, key in enumerate(keys):
+            ttl, idle, size = (_value(r) for r in results[3 * i:3 * i + 3])
+            if ttl is None or ttl == -2:
+                continue  # Expired since SCAN returned it
+            if idle is not None and idle > CART_TTL:
+                pipe.delete(key)
+                report["deleted"] += 1
+                continue
+            if ttl == -1 or ttl > CART_TTL:
+                pipe.expire(key, CART_TTL)
+                report["capped"] += 1
+            report["carts"] += 1
+            report["bytes"] += size or 0
+        await pipe.execute()
+
+
+async def _reaper_loop():
+    """Run a reaper pass every CART_REAPER_INTERVAL seconds."""
+    while True:
+        try:
+            redis = await get_redis_client()
+            if await redis.set(REAPER_LOCK_KEY, "1", nx=True, ex=max(CART_REAPER_INTERVAL - 1, 1)):
+                report = await reap_carts()
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.hset(REAPER_REPORT_KEY, mapping={**report, "finished_at": time.time()})
+                    # Outdated once a few passes are missed (e.g. reaper disabled)
+                    pipe.expire(REAPER_REPORT_KEY, CART_REAPER_INTERVAL * 3)
+                    await pipe.execute()
+        except RedisError as e:
+            log_error(e, "Redis error during cart reaper pass")
+        except Exception as e:
+            log_error(e, "Unexpected error during cart reaper pass")
+        await asyncio.sleep(CART_REAPER_INTERVAL)
+
+
+def start_cart_reaper():
+    """Start the background cart reaper unless CART_REAPER_INTERVAL is 0."""
+    global _reaper_task
+    if CART_REAPER_INTERVAL <= 0 or _reaper_task is not None:
+        return
+    _reaper_task = asyncio.create_task(_reaper_loop())
+    log_info("Cart reaper started", interval=CART_REAPER_INTERVAL, cart_ttl=CART_TTL)
+
+
+async def stop_cart_reaper():
+    """Cancel the background cart reaper."""
+    global _reaper_task
+    if _reaper_task is None:
+        return
+    _reaper_task.cancel()
+    try:
+        await _reaper_task
+    except asyncio.CancelledError:
+        pass
+    _reaper_task = None
+
+
+async def get_cart_reaper_stats() -> Dict[str, Any]:
+    """Get the result of the last reaper pass on any worker (empty until one runs)."""
+    redis = await get_redis_client()
+    fields = await redis.hgetall(REAPER_REPORT_KEY)
+    return {
+        "interval": CART_REAPER_INTERVAL,
+        "cart_ttl": CART_TTL,
+        "last_pass": {
+            name: int(value) if name in REPORT_INT_FIELDS else float(value)
+            for name, value in fields.items()
+        },
+    }
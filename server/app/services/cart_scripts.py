@@ -0,0 +1,299 @@
+from typing import Any, Dict, List
+from redis import asyncio as aioredis
+from redis.commands.core import AsyncScript
+
+
+# Reply statuses shared by the cart scripts
+OK = "ok"
+NOT_FOUND = "notfound"
+NO_CATALOG = "nocatalog"
+EMPTY = "empty"
+REPLAY = "replay"
+
+# Shared Lua helpers prepended to every cart script.
+#
+# A cart hash maps product_id -> "quantity:unit_cents", the unit price in
+# integer cents the line was priced at, plus a summary kept up to date by
+# every mutation so reads never recompute it:
+#   _count, _cents   item count and total in integer cents
+#   _v               product summary _version the lines were priced at
+# Every value stays short so small carts keep Redis' compact listpack
+# hash encoding.
+_FUNCTIONS = """
+local unpack = unpack or table.unpack
+
+-- Legacy carts were JSON strings; convert them to a hash in place,
+-- keeping the remaining TTL. They are priced on the next refresh.
+local function migrate(cart)
+    if redis.call('TYPE', cart).ok == 'string' then
+        local legacy = cjson.decode(redis.call('GET', cart))
+        local ttl_left = redis.call('TTL', cart)
+        redis.call('DEL', cart)
+        for product_id, quantity in pairs(legacy) do
+            redis.call('HSET', cart, product_id, quantity)
+        end
+        if ttl_left > 0 then
+            redis.call('EXPIRE', cart, ttl_left)
+        end
+    end
+end
+
+local function cents(record)
+    return math.floor(cjson.decode(record).price * 100 + 0.5)
+end
+
+-- "quantity:unit_cents" -> quantity, unit_cents; unpriced lines are a bare quantity
+local function parse_line(value)
+    local quantity, price = string.match(value, '^(%-?%d+):(%-?%d+)$')
+    if quantity then
+        return tonumber(quantity), tonumber(price)
+    end
+    return tonumber(value), nil
+end
+
+local function price_version(products)
+    return redis.call('HGET', products, '_version') or ''
+end
+
+-- Re-price every line and recompute the totals from the product summary.
+-- Also rewrites carts stored in earlier layouts.
+local function reprice(cart, products)
+    local flat = redis.call('HGETALL', cart)
+    local count, total = 0, 0
+    for i = 1, #flat, 2 do
+        local field = flat[i]
+        if string.sub(field, 1, 1) ~= '_' then
+            local quantity = parse_line(flat[i + 1])
+            local record = redis.call('HGET', products, field)
+            count = count + quantity
+            if record then
+                local price = cents(record)
+                redis.call('HSET', cart, field, quantity .. ':' .. price)
+                total = total + price * quantity
+            else
+                redis.call('HSET', cart, field, quantity)
+            end
+        end
+    end
+    if count > 0 then
+        redis.call('HSET', cart, '_count', count, '_cents', total, '_v', price_version(products))
+    else
+        redis.call('DEL', cart)
+    end
+end
+
+-- Reprice the cart only if prices changed since its lines were priced.
+-- Returns false when it has never been priced and there is no catalog to
+-- price it from; an already priced cart keeps its prices meanwhile.
+local function refresh(cart, products)
+    if redis.call('EXISTS', cart) == 0 then
+        return true
+    end
+    local priced_at = redis.call('HGET', cart, '_v')
+    if redis.call('EXISTS', products) == 0 then
+        return priced_at ~= false
+    end
+    if priced_at ~= price_version(products) then
+        reprice(cart, products)
+    end
+    return true
+end
+
+-- Set one line's quantity, or add to it; 0 or less removes the line.
+-- The totals move by the difference rather than being recomputed.
+local function set_line(cart, product_id, quantity, record, add)
+    local old, old_price = parse_line(redis.call('HGET', cart, product_id) or '0')
+    if add then
+        quantity = old + quantity
+    end
+    if old == 0 and quantity <= 0 then
+        return
+    end
+    local delta = -(old_price or 0) * old
+    if quantity > 0 then
+        local price = cents(record)
+        redis.call('HSET', cart, product_id, quantity .. ':' .. price)
+        delta = delta + price * quantity
+    else
+        quantity = 0
+        redis.call('HDEL', cart, product_id)
+    end
+    redis.call('HINCRBY', cart, '_cents', delta)
+    if redis.call('HINCRBY', cart, '_count', quantity - old) <= 0 then
+        redis.call('DEL', cart)
+    end
+end
+
+-- Stamp a new cart with the price version and slide its expiry
+local function touch(cart, products, ttl)
+    if redis.call('EXISTS', cart) == 1 then
+        redis.call('HSETNX', cart, '_v', price_version(products))
+        redis.call('EXPIRE', cart, ttl)
+    end
+end
+
+-- Reply: {status, item_count, total_cents, rejected,
+--         product_id, quantity, unit_cents, product_json, ...}
+-- product_json is nil if the product summary is unavailable, in which case
+-- the status is 'nocatalog' but the stored quantities and prices still apply.
+local function summarize(cart, products, rejected)
+    local flat = redis.call('HGETALL', cart)
+    local reply = {'ok', 0, 0, rejected}
+    local ids, lines = {}, {}
+    for i = 1, #flat, 2 do
+        local field = flat[i]
+        if field == '_count' or field == '_cents' then
+            reply[field == '_count' and 2 or 3] = tonumber(flat[i + 1])
+        elseif string.sub(field, 1, 1) ~= '_' then
+            local quantity, price = parse_line(flat[i + 1])
+            if price then
+                ids[#ids + 1] = field
+                lines[#lines + 1] = {quantity, price}
+            end
+        end
+    end
+    if #ids > 0 then
+        if redis.call('EXISTS', products) == 0 then
+            reply[1] = 'nocatalog'
+        end
+        local records = redis.call('HMGET', products, unpack(ids))
+        for j = 1, #ids do
+            reply[#reply + 1] = ids[j]
+            reply[#reply + 1] = lines[j][1]
+            reply[#reply + 1] = lines[j][2]
+            reply[#reply + 1] = records[j]
+        end
+    end
+    return reply
+end
+"""
+
+# KEYS: cart, product summary hash
+# ARGV: op (get | add | set | remove), product_id, quantity, ttl
+# Every call, reads included, slides the cart's expiry.
+CART_SCRIPT = _FUNCTIONS + """
+local cart, products = KEYS[1], KEYS[2]
+local op, product_id, quantity, ttl = ARGV[1], ARGV[2], tonumber(ARGV[3]), tonumber(ARGV[4])
+migrate(cart)
+
+if op == 'add' or op == 'set' then
+    if redis.call('EXISTS', products) == 0 then
+        return {'nocatalog', 0, 0, ''}
+    end
+    local record = redis.call('HGET', products, product_id)
+    if not record then
+        return {'notfound', 0, 0, ''}
+    end
+    refresh(cart, products)
+    set_line(cart, product_id, quantity, record, op == 'add')
+else
+    if not refresh(cart, products) then
+        return {'nocatalog', 0, 0, ''}
+    end
+    if op == 'remove' then
+        set_line(cart, product_id, 0, nil, false)
+    end
+end
+touch(cart, products, ttl)
+return summarize(cart, products, '')
+"""
+
+# KEYS: cart, product summary hash
+# ARGV: ttl, then (op, product_id, quantity) per operation
+# Operations on unknown products are skipped and their 1-based positions
+# returned comma-separated in the rejected field; the rest apply atomically.
+BATCH_SCRIPT = _FUNCTIONS + """
+local cart, products = KEYS[1], KEYS[2]
+local ttl = tonumber(ARGV[1])
+migrate(cart)
+
+if redis.call('EXISTS', products) == 0 then
+    for i = 2, #ARGV, 3 do
+        if ARGV[i] ~= 'remove' then
+            return {'nocatalog', 0, 0, ''}
+        end
+    end
+end
+if not refresh(cart, products) then
+    return {'nocatalog', 0, 0, ''}
+end
+
+local rejected = {}
+for i = 2, #ARGV, 3 do
+    local op, product_id, quantity = ARGV[i], ARGV[i + 1], tonumber(ARGV[i + 2])
+    if op == 'remove' then
+        set_line(cart, product_id, 0, nil, false)
+    else
+        local record = redis.call('HGET', products, product_id)
+        if record then
+            set_line(cart, product_id, quantity, record, op == 'add')
+        else
+            rejected[#rejected + 1] = math.floor((i + 1) / 3)
+        end
+    end
+end
+touch(cart, products, ttl)
+return summarize(cart, products, table.concat(rejected, ','))
+"""
+
+# KEYS: cart, product summary hash, idempotency key, order hash, order stream
+# ARGV: order_id, request fingerprint, idempotency TTL, session_id,
+#       details_json, created_at, order TTL, stream MAXLEN
+# Snapshots and deletes the cart, records the order under the idempotency
+# key and the order hash, and queues it on the order stream in one step.
+# If the idempotency key already holds an order, nothing runs and that
+# order is returned with status 'replay'.
+# Reply: {status, order_json}
+CHECKOUT_SCRIPT = _FUNCTIONS + """
+local cart, products, idempotency, order_key, stream = KEYS[1], KEYS[2], KEYS[3], KEYS[4], KEYS[5]
+local order_id, fingerprint, ttl = ARGV[1], ARGV[2], tonumber(ARGV[3])
+
+local existing = redis.call('GET', idempotency)
+if existing then
+    return {'replay', existing}
+end
+migrate(cart)
+if not refresh(cart, products) then
+    return {'nocatalog', ''}
+end
+local summary = summarize(cart, products, '')
+if summary[2] <= 0 then
+    return {'empty', ''}
+end
+redis.call('DEL', cart)
+local order = cjson.encode({order_id = order_id, fingerprint = fingerprint, cart = summary})
+redis.call('SET', idempotency, order, 'EX', ttl)
+redis.call('HSET', order_key,
+    'status', 'pending', 'session_id', ARGV[4], 'record', order, 'details', ARGV[5],
+    'attempts', 0, 'created_at', ARGV[6], 'updated_at', ARGV[6])
+redis.call('EXPIRE', order_key, tonumber(ARGV[7]))
+redis.call('XADD', stream, 'MAXLEN', '~', ARGV[8], '*', 'order_id', order_id)
+return {'ok', order}
+"""
+
+SCRIPTS = {
+    "cart": CART_SCRIPT,
+    "batch": BATCH_SCRIPT,
+    "checkout": CHECKOUT_SCRIPT,
+}
+
+_registered: Dict[str, AsyncScript] = {}
+
+
+async def run_script(redis: aioredis.Redis, name: str, keys: List[str], args: List[Any]) -> List[Any]:
+    """
+    Run a cart script by name with EVALSHA, loading it on first use or
+    after a Redis restart (NOSCRIPT).
+    Args:
+        redis: Redis client
+        name: Key of SCRIPTS
+        keys: Script KEYS
+        args: Script ARGV
+    Returns:
+        List[Any]: Script reply
+    """
+    script = _registered.get(name)
+    if script is None:
+        script = redis.register_script(SCRIPTS[name])
+        _registered[name] = script
+    return await script(keys=keys, args=args, client=redis)
@@ -1,12 +1,79 @@
 import os
-from typing import Any, Dict
-import json
+from typing import Any, Dict, List
+import orjson
 from redis.exceptions import RedisError
-from app.services.product_service import get_products, get_redis_client
+from app.services.product_service import get_redis_client, ensure_product_summary, PRODUCT_SUMMARY_KEY
+from app.services.cart_scripts import run_script, NOT_FOUND, NO_CATALOG
 from app.core.logging_config import log_error, log_info, log_warning
 
+# Carts are Redis hashes of product_id -> quantity and unit price under
+# cart:<session_id>, stored alongside a summary (count and total) that each
+# mutation updates incrementally. Every operation is one Lua script call;
+# reads return the stored summary and only reprice when product prices
+# changed since it was computed (see cart_scripts).
 CART_KEY = "cart:"
-CART_TTL = int(os.getenv("CART_CACHE_TTL","31536000"))
+# Sliding expiry: every cart read or write restarts it, so only carts left
+# idle this long expire
+CART_TTL = int(os.getenv("CART_CACHE_TTL","604800"))
+CART_OPERATIONS = ("add", "remove", "set")
+MAX_BATCH_OPERATIONS = 100
+
+
+def _empty_cart(session_id: str) -> Dict[str, Any]:
+    return {
+        'session_id': session_id,
+        'items': [],
+        'total': 0.0,
+        'item_count': 0
+    }
+
+
+async def _run_cart_script(session_id: str, op: str, product_id: str = "", quantity: int = 0) -> List[Any]:
+    """
+    Run the "cart" script for one operation via _run.
+    Args:
+        session_id: User session identifier
+        op: "get", "add", "set" or "remove"
+        product_id: Product ID the operation applies to
+        quantity: Quantity for "add" and "set"
+    Returns:
+        List[Any]: Script reply
+    """
+    return await _run(session_id, "cart", [op, product_id, quantity, CART_TTL])
+
+
+async def _run(session_id: str, script: str, args: List[Any]) -> List[Any]:
+    """Run a cart script, retrying once after rebuilding a missing product summary hash."""
+    redis = await get_redis_client()
+    keys = [f"{CART_KEY}{session_id}", PRODUCT_SUMMARY_KEY]
+    reply = await run_script(redis, script, keys, args)
+    if reply[0] == NO_CATALOG and await ensure_product_summary():
+        reply = await run_script(redis, script, keys, args)
+    return reply
+
+
+def cart_from_reply(session_id: str, reply: List[Any]) -> Dict[str, Any]:
+    """Build the cart response from a script reply."""
+    _, item_count, total_cents, _, *flat = reply
+    items = []
+    for i in range(0, len(flat), 4):
+        product_id, quantity, unit_cents = flat[i], int(flat[i + 1]), int(flat[i + 2])
+        # Product details are missing only while the catalog is unavailable
+        product = orjson.loads(flat[i + 3]) if flat[i + 3] else {}
+        items.append({
+            'product_id': product_id,
+            'title': product.get('title', ''),
+            'price': unit_cents / 100,
+            'quantity': quantity,
+            'subtotal': round(unit_cents * quantity / 100, 2),
+            'image': product.get('image', '')
+        })
+    return {
+        'session_id': session_id,
+        'items': items,
+        'total': round(int(total_cents) / 100, 2),
+        'item_count': int(item_count)
+    }
 
 
 async def get_cart(session_id: str) -> Dict[str, Any]:
@@ -18,57 +85,19 @@ async def get_cart(session_id: str) -> Dict[str, Any]:
         dict: Cart with items and total
     """
     try:
-        redis = await get_redis_client()
-        cart_key = f"{CART_KEY}{session_id}"
-        
-        # Get cart from Redis
-        cached_cart = await redis.get(cart_key)
-        cart_items = json.loads(cached_cart) if cached_cart else {}
-        
-        # Build cart details
-        products = await get_products()
-        items = []
-        total = 0.0
-        
-        for product_id, quantity in cart_items.items():
-            product = next((p for p in products if str(p['id']) == product_id), None)
-            if product:
-                item_total = product['price'] * quantity
-                items.append({
-                    'product_id': product_id,
-                    'title': product['title'],
-                    'price': product['price'],
-                    'quantity': quantity,
-                    'subtotal': round(item_total, 2),
-                    'image': product.get('image', '')
-                })
-                total += item_total
-        
-        log_info("Cart retrieved", session_id=session_id, item_count=len(items))
-        
-        return {
-            'session_id': session_id,
-            'items': items,
-            'total': round(total, 2),
-            'item_count': sum(cart_items.values())
-        }
-        
+        reply = await _run_cart_script(session_id, "get")
+        cart = cart_from_reply(session_id, reply)
+
+        log_info("Cart retrieved", session_id=session_id, item_count=len(cart['items']))
+
+        return cart
+
     except RedisError as e:
         log_error(e, "Redis error getting cart", session_id=session_id)
-        return {
-            'session_id': session_id,
-            'items': [],
-            'total': 0.0,
-            'item_count': 0
-        }
+        return _empty_cart(session_id)
     except Exception as e:
         log_error(e, "Unexpected error getting cart", session_id=session_id)
-        return {
-            'session_id': session_id,
-            'items': [],
-            'total': 0.0,
-            'item_count': 0
-        }
+        return _empty_cart(session_id)
 
 
 async def add_to_cart(session_id: str, product_id: str, quantity: int = 1) -> Dict[str, Any]:
@@ -82,36 +111,18 @@ async def add_to_cart(session_id: str, product_id: str, quantity: int = 1) -> Di
         dict: Updated cart
     """
     try:
-        # Verify product exists
-        products = await get_products()
-        product = next((p for p in products if str(p['id']) == product_id), None)
-        
-        if not product:
+        # Validates the product and increments atomically in one round trip
+        reply = await _run_cart_script(session_id, "add", product_id, quantity)
+        if reply[0] in (NOT_FOUND, NO_CATALOG):
             raise ValueError(f"Product {product_id} not found")
-        
-        redis = await get_redis_client()
-        cart_key = f"{CART_KEY}{session_id}"
-        
-        # Get current cart
-        cached_cart = await redis.get(cart_key)
-        cart_items = json.loads(cached_cart) if cached_cart else {}
-        
-        # Add or update quantity
-        if product_id in cart_items:
-            cart_items[product_id] += quantity
-        else:
-            cart_items[product_id] = quantity
-        
-        # Save back to Redis with TTL
-        await redis.setex(cart_key, CART_TTL, json.dumps(cart_items))
-        
-        log_info("Item added to cart", 
-                 session_id=session_id, 
-                 product_id=product_id, 
+
+        log_info("Item added to cart",
+                 session_id=session_id,
+                 product_id=product_id,
                  quantity=quantity)
-        
-        return await get_cart(session_id)
-        
+
+        return cart_from_reply(session_id, reply)
+
     except ValueError as e:
         log_warning(str(e), session_id=session_id, product_id=product_id)
         raise
@@ -133,29 +144,14 @@ async def remove_from_cart(session_id: str, product_id: str) -> Dict[str, Any]:
         dict: Updated cart
     """
     try:
-        redis = await get_redis_client()
-        cart_key = f"{CART_KEY}{session_id}"
-        
-        # Get current cart
-        cached_cart = await redis.get(cart_key)
-        cart_items = json.loads(cached_cart) if cached_cart else {}
-        
-        # Remove item
-        if product_id in cart_items:
-            del cart_items[product_id]
-            
-            # Save back to Redis
-            if cart_items:
-                await redis.setex(cart_key, CART_TTL, json.dumps(cart_items))
-            else:
-                await redis.delete(cart_key)
-            
-            log_info("Item removed from cart", 
-                     session_id=session_id, 
-                     product_id=product_id)
-        
-        return await get_cart(session_id)
-        
+        reply = await _run_cart_script(session_id, "remove", product_id)
+
+        log_info("Item removed from cart",
+                 session_id=session_id,
+                 product_id=product_id)
+
+        return cart_from_reply(session_id, reply)
+
     except RedisError as e:
         log_error(e, "Redis error removing from cart", session_id=session_id)
         raise
@@ -176,28 +172,22 @@ async def update_quantity(session_id: str, product_id: str, quantity: int) -> Di
     """
     if quantity <= 0:
         return await remove_from_cart(session_id, product_id)
-    
+
     try:
-        redis = await get_redis_client()
-        cart_key = f"{CART_KEY}{session_id}"
-        
-        # Get current cart
-        cached_cart = await redis.get(cart_key)
-        cart_items = json.loads(cached_cart) if cached_cart else {}
-        
-        # Update quantity
-        cart_items[product_id] = quantity
-        
-        # Save back to Redis
-        await redis.setex(cart_key, CART_TTL, json.dumps(cart_items))
-        
-        log_info("Cart quantity updated", 
-                 session_id=session_id, 
-                 product_id=product_id, 
+        reply = await _run_cart_script(session_id, "set", product_id, quantity)
+        if reply[0] in (NOT_FOUND, NO_CATALOG):
+            raise ValueError(f"Product {product_id} not found")
+
+        log_info("Cart quantity updated",
+                 session_id=session_id,
+                 product_id=product_id,
                  quantity=quantity)
-        
-        return await get_cart(session_id)
-        
+
+        return cart_from_reply(session_id, reply)
+
+    except ValueError as e:
+        log_warning(str(e), session_id=session_id, product_id=product_id)
+        raise
     except RedisError as e:
         log_error(e, "Redis error updating cart", session_id=session_id)
         raise
@@ -206,6 +196,52 @@ async def update_quantity(session_id: str, product_id: str, quantity: int) -> Di
         raise
 
 
+async def apply_cart_operations(session_id: str, operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Apply several add, remove and set operations to a cart atomically in
+    one round trip and return the cart once.
+    Operations on unknown products are skipped; the others all apply.
+    Args:
+        session_id: User session identifier
+        operations: Dicts with "op" ("add", "remove" or "set"), "product_id" and "quantity"
+    Returns:
+        dict: {"cart": updated cart, "failed": product IDs that were not found}
+    """
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise ValueError(f"At most {MAX_BATCH_OPERATIONS} operations per batch")
+
+    args: List[Any] = [CART_TTL]
+    for operation in operations:
+        op = operation.get("op")
+        if op not in CART_OPERATIONS:
+            raise ValueError(f"Unknown cart operation: {op}")
+        args.extend([op, str(operation["product_id"]), int(operation.get("quantity", 1))])
+
+    try:
+        reply = await _run(session_id, "batch", args)
+        if reply[0] == NO_CATALOG:
+            # Nothing can be validated without a catalog - reject every add/set
+            failed = [str(o["product_id"]) for o in operations if o["op"] != "remove"]
+            return {"cart": await get_cart(session_id), "failed": failed}
+
+        rejected = [int(i) for i in reply[3].split(",")] if reply[3] else []
+        failed = [str(operations[i - 1]["product_id"]) for i in rejected]
+
+        log_info("Cart batch applied",
+                 session_id=session_id,
+                 operations=len(operations),
+                 failed=len(failed))
+
+        return {"cart": cart_from_reply(session_id, reply), "failed": failed}
+
+    except RedisError as e:
+        log_error(e, "Redis error applying cart batch", session_id=session_id)
+        raise
+    except Exception as e:
+        log_error(e, "Unexpected error applying cart batch", session_id=session_id)
+        raise
+
+
 async def clear_cart(session_id: str) -> Dict[str, Any]:
     """
     Clear all items from cart in Redis.
@@ -217,14 +253,14 @@ async def clear_cart(session_id: str) -> Dict[str, Any]:
     try:
         redis = await get_redis_client()
         cart_key = f"{CART_KEY}{session_id}"
-        
+
         # Delete cart from Redis
         await redis.delete(cart_key)
-        
+
         log_info("Cart cleared", session_id=session_id)
-        
-        return await get_cart(session_id)
-        
+
+        return _empty_cart(session_id)
+
     except RedisError as e:
         log_error(e, "Redis error clearing cart", session_id=session_id)
         raise
@@ -242,14 +278,9 @@ async def get_cart_item_count(session_id: str) -> int:
         int: Total item count
     """
     try:
-        redis = await get_redis_client()
-        cart_key = f"{CART_KEY}{session_id}"
-        
-        cached_cart = await redis.get(cart_key)
-        cart_items = json.loads(cached_cart) if cached_cart else {}
-        
-        return sum(cart_items.values())
-        
+        reply = await _run_cart_script(session_id, "get")
+        return int(reply[1])
+
     except Exception as e:
         log_error(e, "Error getting cart item count", session_id=session_id)
-        return 0
\ No newline at end of file
+        return 0
@@ -0,0 +1,157 @@
+import hashlib
+import threading
+from typing import List, Dict, Any, Optional, Union, Callable
+import numpy as np
+from app.services.search_index import SearchIndex
+from app.services.facet_index import FacetIndex, product_price, product_rating
+
+
+# Sort keys for presorted listings; ties are broken by id
+SORT_KEYS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "id": lambda p: p.get("id", 0),
+    "price": lambda p: (product_price(p), p.get("id", 0)),
+    "rating": lambda p: (product_rating(p), p.get("id", 0)),
+}
+
+
+class Catalog:
+    """
+    In-process, decoded snapshot of the product catalog.
+    Holds the product list once and prebuilt lookup tables so callers
+    never rescan or re-deserialize the catalog.
+    """
+
+    def __init__(self, products: List[Dict[str, Any]], version: str):
+        self.products = products
+        self.version = version
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+        self.by_category: Dict[str, List[Dict[str, Any]]] = {}
+        self._encoded: Dict[str, bytes] = {}
+        self._etags: Dict[str, str] = {}
+        self._sorted: Dict[str, List[Dict[str, Any]]] = {}
+        self._orders: Dict[str, np.ndarray] = {}
+        self._search_index: Optional[SearchIndex] = None
+        self._facet_index: Optional[FacetIndex] = None
+        self._index_lock = threading.Lock()
+
+        for product in products:
+            self.by_id[str(product.get("id"))] = product
+            category = str(product.get("category", "")).lower()
+            self.by_category.setdefault(category, []).append(product)
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def get(self, product_id: Union[int, str]) -> Optional[Dict[str, Any]]:
+        """Get a product by ID (int or str)."""
+        return self.by_id.get(str(product_id))
+
+    def get_category(self, category_name: str) -> List[Dict[str, Any]]:
+        """Get products in a category (case-insensitive)."""
+        return self.by_category.get(category_name.lower(), [])
+
+    @property
+    def categories(self) -> List[str]:
+        """Lowercased category names present in the catalog."""
+        return list(self.by_category.keys())
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """Full-text index over the catalog, built once per version."""
+        if self._search_index is None:
+            with self._index_lock:
+                if self._search_index is None:
+                    self._search_index = SearchIndex(self.products)
+        return self._search_index
+
+    @property
+    def facet_index(self) -> FacetIndex:
+        """Price, rating and category filter index, built once per version."""
+        if self._facet_index is None:
+            with self._index_lock:
+                if self._facet_index is None:
+                    self._facet_index = FacetIndex(self.products)
+        return self._facet_index
+
+    def warm(self):
+        """Build derived indexes ahead of the first request that needs them."""
+        self.search_index
+        self.facet_index
+
+    def sorted_by(self, sort: str) -> List[Dict[str, Any]]:
+        """
+        Get products presorted ascending by a SORT_KEYS key, built once per version.
+        Args:
+            sort: Sort key name ("id", "price" or "rating")
+        Returns:
+            List[Dict[str, Any]]: Products in ascending order
+        """
+        ordered = self._sorted.get(sort)
+        if ordered is None:
+            ordered = [self.products[i] for i in self.sort_order(sort).tolist()]
+            self._sorted[sort] = ordered
+        return ordered
+
+    def sort_order(self, sort: str) -> np.ndarray:
+        """
+        Get product positions in ascending SORT_KEYS order, built once per version.
+        Filtering this array by a bitset keeps it sorted, so filtered
+        listings never need a sort.
+        """
+        order = self._orders.get(sort)
+        if order is None:
+            key = SORT_KEYS[sort]
+            order = np.array(
+                sorted(range(len(self.products)), key=lambda i: key(self.products[i])),
+                dtype=np.int64
+            )
+            self._orders[sort] = order
+        return order
+
+    def page(self, sort: str, offset: int, limit: int, descending: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get one page of products as a slice of a presorted index.
+        Args:
+            sort: Sort key name
+            offset: Number of products to skip
+            limit: Maximum number of products to return
+            descending: Reverse the sort order
+        Returns:
+            List[Dict[str, Any]]: Products on the page
+        """
+        ordered = self.sorted_by(sort)
+        if not descending:
+            return ordered[offset:offset + limit]
+        end = max(len(ordered) - offset, 0)
+        return ordered[max(end - limit, 0):end][::-1]
+
+    def get_encoded(self, key: str, build: Callable[[], bytes]) -> bytes:
+        """
+        Get pre-encoded response bytes, building them once per catalog version.
+        Args:
+            key: Cache key for the encoded variant (e.g. "all", "category:jewelery")
+            build: Callable producing the encoded bytes on first use
+        Returns:
+            bytes: Encoded response body
+        """
+        encoded = self._encoded.get(key)
+        if encoded is None:
+            encoded = build()
+            self._encoded[key] = encoded
+        return encoded
+
+    def get_etag(self, key: str, build: Callable[[], bytes]) -> str:
+        """
+        Get a strong ETag (content hash) for an encoded variant.
+        Args:
+            key: Cache key for the encoded variant
+            build: Callable producing the encoded bytes on first use
+        Returns:
+            str: Quoted ETag value
+        """
+        etag = self._etags.get(key)
+        if etag is None:
+            digest = hashlib.sha1(self.get_encoded(key, build)).hexdigest()[:20]
+            etag = f'"{digest}"'
+            self._etags[key] = etag
+        return etag
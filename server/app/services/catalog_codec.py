@@ -0,0 +1,86 @@
+import json
+import zlib
+from typing import List, Dict, Any, Union
+import orjson
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+
+# Encoded blobs start with MAGIC and a one-byte codec id. Legacy entries
+# are plain JSON text, which never starts with a NUL byte, so both
+# formats can be read side by side during a rollout.
+MAGIC = b"\x00EVC"
+CODEC_IDS = {"orjson": b"j", "zlib": b"z", "zstd": b"s"}
+CODECS = ("json",) + tuple(CODEC_IDS)
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def zstd_available() -> bool:
+    """zstd needs the optional zstandard package."""
+    return zstandard is not None
+
+
+def is_encoded(raw: Union[str, bytes]) -> bool:
+    """Check whether a cached blob carries the codec marker."""
+    return isinstance(raw, bytes) and raw.startswith(MAGIC)
+
+
+def encode_blob(products: List[Dict[str, Any]], payload: str, codec: str) -> Union[str, bytes]:
+    """
+    Encode a catalog for storage in Redis.
+    Args:
+        products: Products to encode
+        payload: The catalog as json.dumps text, stored as-is for the "json" codec
+        codec: One of CODECS
+    Returns:
+        Union[str, bytes]: Legacy JSON text, or marker + codec id + encoded body
+    """
+    if codec == "json":
+        return payload
+    if codec not in CODEC_IDS:
+        raise ValueError(f"Unknown catalog codec: {codec}")
+
+    body = orjson.dumps(products)
+    if codec == "zlib":
+        body = zlib.compress(body, ZLIB_LEVEL)
+    elif codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd codec requires the zstandard package")
+        body = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return MAGIC + CODEC_IDS[codec] + body
+
+
+def decode_blob(raw: Union[str, bytes]) -> List[Dict[str, Any]]:
+    """
+    Decode a catalog blob written by encode_blob with any codec, or a legacy JSON entry.
+    Args:
+        raw: Value read from Redis
+    Returns:
+        List[Dict[str, Any]]: Decoded products
+    Raises:
+        ValueError: If the blob is corrupt or its codec is unavailable
+    """
+    if not is_encoded(raw):
+        return json.loads(raw)
+
+    codec_id = raw[len(MAGIC):len(MAGIC) + 1]
+    body = memoryview(raw)[len(MAGIC) + 1:]
+    if codec_id == CODEC_IDS["orjson"]:
+        return orjson.loads(body)
+    if codec_id == CODEC_IDS["zlib"]:
+        try:
+            return orjson.loads(zlib.decompress(body))
+        except zlib.error as e:
+            raise ValueError(f"Corrupt zlib catalog blob: {e}") from e
+    if codec_id == CODEC_IDS["zstd"]:
+        if zstandard is None:
+            raise ValueError("Cached catalog is zstd-compressed but zstandard is not installed")
+        try:
+            return orjson.loads(zstandard.ZstdDecompressor().decompress(body))
+        except zstandard.ZstdError as e:
+            raise ValueError(f"Corrupt zstd catalog blob: {e}") from e
+    raise ValueError(f"Unknown catalog codec id: {codec_id!r}")
@@ -0,0 +1,99 @@
+import os
+import mmap
+import struct
+import zlib
+from typing import List, Dict, Any, Optional, Tuple
+import orjson
+
+
+# File layout (little endian):
+#   header   magic, format version, product count, catalog version length, CRC32 of the rest
+#   version  catalog version, utf-8
+#   offsets  (count + 1) uint64 record offsets, relative to the start of the records
+#   records  one orjson-encoded product per record
+MAGIC = b"EVCS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHIHI")
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is truncated, corrupt or of an unknown format."""
+
+
+def write_snapshot(path: str, products: List[Dict[str, Any]], version: str) -> int:
+    """
+    Write a catalog snapshot atomically (temp file + rename).
+    Args:
+        path: Snapshot file path
+        products: Products to store
+        version: Catalog version the products belong to
+    Returns:
+        int: Size of the written file in bytes
+    """
+    records = [orjson.dumps(product) for product in products]
+    offsets = [0]
+    for record in records:
+        offsets.append(offsets[-1] + len(record))
+
+    version_bytes = version.encode("utf-8")
+    body = b"".join([
+        version_bytes,
+        struct.pack(f"<{len(offsets)}Q", *offsets),
+        *records,
+    ])
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(records), len(version_bytes), zlib.crc32(body))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(body)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(header) + len(body)
+
+
+def read_snapshot(path: str) -> Optional[Tuple[List[Dict[str, Any]], str]]:
+    """
+    Load a catalog snapshot through a read-only memory map.
+    Args:
+        path: Snapshot file path
+    Returns:
+        Optional[Tuple[List[Dict[str, Any]], str]]: Products and catalog version, or None if there is no snapshot
+    Raises:
+        SnapshotError: If the file is corrupt or of an unknown format
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+
+    with f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            raise SnapshotError(f"Snapshot {path} is truncated")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                magic, format_version, count, version_len, crc = HEADER.unpack_from(view)
+                if magic != MAGIC:
+                    raise SnapshotError(f"{path} is not a catalog snapshot")
+                if format_version != FORMAT_VERSION:
+                    raise SnapshotError(f"Unsupported snapshot format {format_version}")
+                if zlib.crc32(view[HEADER.size:]) != crc:
+                    raise SnapshotError(f"Snapshot {path} failed its checksum")
+
+                version_end = HEADER.size + version_len
+                version = bytes(view[HEADER.size:version_end]).decode("utf-8")
+                offsets = struct.unpack_from(f"<{count + 1}Q", view, version_end)
+                records_start = version_end + (count + 1) * 8
+                products = [
+                    orjson.loads(view[records_start + offsets[i]:records_start + offsets[i + 1]])
+                    for i in range(count)
+                ]
+            except (struct.error, orjson.JSONDecodeError, UnicodeDecodeError) as e:
+                raise SnapshotError(f"Snapshot {path} is corrupt: {e}") from e
+            finally:
+                view.release()
+    return products, version
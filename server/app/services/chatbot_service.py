@@ -1,37 +1,17 @@
-import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any
 from app.embeddings.chroma_client import get_chroma_client
-from app.services.product_service import get_products
-from app.embeddings.embed_products import create_embeddings
-from app.services.cart_service import get_cart, add_to_cart, remove_from_cart, update_quantity, clear_cart
+from app.services.product_service import get_catalog
+from app.embeddings.query_cache import get_query_embedding
+from app.services.cart_service import get_cart, add_to_cart, update_quantity, clear_cart, apply_cart_operations
+from app.services.intent_classifier import classify
 
 
 class ChatbotService:
     """Chatbot responses based on user queries"""
 
-    # ShopHub topic keywords mapping
-    SHOPHUB_TOPICS = {
-        "shipping": ["shipping details", "ship"],
-        "returns": ["return", "returns"],
-        "refund": ["refund", "refunds"],
-        "delivery": ["delivery", "deliver"],
-        "warranty": ["warranty", "guarantee"],
-        "support": ["support", "help","customer service", "service"],
-        "contact": ["contact"],
-        "policy": ["policy", "policies", "terms"],
-    }
-
     def __init__(self):
         self.collection = get_chroma_client()
 
-    def _detect_shophub_topic(self, message: str) -> Optional[str]:
-        """Detect ShopHub topic from message keywords."""
-        message_lower = message.lower()
-        for topic, keywords in self.SHOPHUB_TOPICS.items():
-            if any(keyword in message_lower for keyword in keywords):
-                return topic
-        return None
-    
     async def process_message(self, message: str, session_id: str) -> Dict[str, Any]:
         """
         Process user message and return appropriate response.
@@ -41,17 +21,8 @@ class ChatbotService:
         Returns:
             dict: Response with message and metadata
         """
-        message_lower = message.lower()
-
-        # Detect intent
-        intent = self._detect_intent(message_lower)
-        
-        # Extract product IDs and quantities for relevant intents
-        product_ids = self._extract_product_ids(message) if any(
-            keyword in intent for keyword in ["add", "remove", "cart", "checkout", "product"]
-        ) else []
-        
-        quantity = self._extract_quantity(message) if "add" in intent else 1
+        # Detect intent and extract product IDs, quantity and topic in one pass
+        intent, product_ids, quantity, topic = classify(message)
 
         # Route to appropriate handler
         if intent == "greeting":
@@ -97,8 +68,6 @@ class ChatbotService:
             return await self._handle_add_to_cart(session_id, product_id, quantity)
 
         elif intent == "shophub_info":
-            topic = self._detect_shophub_topic(message_lower)
-            
             if topic is None:
                 return {
                     "response": "Could you clarify what information you need? I can help with shipping, returns, refunds, policies, or support.",
@@ -122,112 +91,6 @@ class ChatbotService:
                 "intent": "greeting"
             }
 
-    def _detect_intent(self, message: str) -> str:
-        """
-        Classify user intent based on keywords.
-        Args:
-            message: User's message in lowercase
-        Returns:
-            str: Detected intent
-        """
-
-        # Greeting queries
-        if any(greet in message for greet in ["hello", "hi", "hey", "good morning", "good afternoon", "good evening", "how are you"]):
-            return "greeting"
-
-        # Clear/empty cart
-        if any(phrase in message for phrase in ["clear cart", "empty cart", "remove everything", "delete everything", "clear my cart"]):
-            return "clear_cart"
-
-        # Remove from cart
-        if any(phrase in message for phrase in ["remove", "delete", "take out"]) and ("cart" in message or "product" in message):
-            return "remove_from_cart"
-
-        # Multi-product add to cart (check before single add)
-        if ("add" in message or "put" in message) and len(self._extract_product_ids(message)) > 1:
-            return "add_multiple_to_cart"
-
-        # Add to cart
-        if any(phrase in message for phrase in ["add product", "add item", "add this", "add to cart", "put in cart"]):
-            return "add_to_cart"
-
-        # Checkout with products
-        if "checkout" in message and any(word in message for word in ["add", "put", "product"]):
-            return "add_and_checkout"
-        
-        # Checkout
-        if any(phrase in message for phrase in ["checkout", "buy now", "purchase", "place order", "pay now", "proceed to checkout"]):
-            return "checkout"
-
-        # Cart queries
-        if any(phrase in message for phrase in ["my cart", "show cart", "view cart", "cart contents", "what's in my cart"]) or message.strip() == "cart":
-            return "cart_query"
-
-        # Product by ID
-        if re.search(r'product\s*(?:id|#)?\s*(\d+)', message) or re.search(r'id\s*:?\s*\d+', message):
-            return "product_by_id"
-
-        # ShopHub info - check before product search
-        if self._detect_shophub_topic(message):
-            return "shophub_info"
-        
-        # Product search keywords
-        product_keywords = ["product", "item", "buy", "shop", "find", "show", "looking for", "need", "want", "price", "cost", "cheap", "expensive", "available"]
-        
-        if any(keyword in message for keyword in product_keywords):
-            return "product_search"
-        
-        return "unknown"
-    
-    def _extract_product_ids(self, message: str) -> List[str]:
-        """
-        Extract multiple product IDs from message.
-        Handles: "Add product 5, 6, and 7", "products 1 2 3", "product 5 and 9"
-        """
-        pattern1 = r'products?\s+(\d+(?:\s*,?\s*(?:and\s+)?\d+)*)'
-        pattern2 = r'\b(\d+)\b'
-        
-        matches = re.findall(pattern1, message.lower())
-        
-        product_ids = []
-        if matches:
-            for match in matches:
-                numbers = re.findall(r'\d+', match)
-                product_ids.extend(numbers)
-        else:
-            product_ids = re.findall(pattern2, message)
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_ids = []
-        for pid in product_ids:
-            if pid not in seen:
-                seen.add(pid)
-                unique_ids.append(pid)
-        
-        return unique_ids
-
-    def _extract_quantity(self, message: str) -> int:
-        """
-        Extract quantity from message.
-        Handles: "add 2 of product 5", "add 5 products", "put 3 items"
-        """
-        patterns = [
-            r'(\d+)\s+(?:of|x)\s+product',
-            r'(\d+)\s+products?',
-            r'(\d+)\s+items?',
-            r'add\s+(\d+)\s+',
-            r'put\s+(\d+)\s+',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, message.lower())
-            if match:
-                quantity = int(match.group(1))
-                return min(quantity, 99)
-        
-        return 1
-
     async def _handle_cart_query(self, session_id: str) -> Dict[str, Any]:
         """Handle cart query intent."""
         cart = await get_cart(session_id)
@@ -267,8 +130,7 @@ class ChatbotService:
                 "cart": cart
             }
         
-        await clear_cart(session_id)
-        updated_cart = await get_cart(session_id)
+        updated_cart = await clear_cart(session_id)
         
         return {
             "response": "Your cart has been cleared successfully.",
@@ -285,25 +147,30 @@ class ChatbotService:
                 "intent": "remove_from_cart"
             }
         
-        products = await get_products()
+        catalog = await get_catalog()
         removed_products = []
         failed_products = []
         
         for product_id in product_ids:
-            product = next((p for p in products if str(p['id']) == product_id), None)
+            product = catalog.get(product_id)
             
             if not product:
                 failed_products.append(product_id)
                 continue
-            
+            removed_products.append(product)
+        
+        # Remove everything in one atomic batch
+        operations = [{"op": "remove", "product_id": str(p['id'])} for p in removed_products]
+        if operations:
             try:
-                await remove_from_cart(session_id, product_id)
-                removed_products.append(product)
+                cart = (await apply_cart_operations(session_id, operations))["cart"]
             except Exception as e:
-                print(f"Failed to remove product {product_id}: {e}")
-                failed_products.append(product_id)
-        
-        cart = await get_cart(session_id)
+                print(f"Failed to remove products {product_ids}: {e}")
+                failed_products.extend(str(p['id']) for p in removed_products)
+                removed_products = []
+                cart = await get_cart(session_id)
+        else:
+            cart = await get_cart(session_id)
         
         if not removed_products:
             return {
@@ -338,25 +205,37 @@ class ChatbotService:
                 "intent": "add_multiple_to_cart"
             }
         
-        products = await get_products()
+        catalog = await get_catalog()
         added_products = []
         failed_products = []
         
         for product_id in product_ids:
-            product = next((p for p in products if str(p['id']) == product_id), None)
+            product = catalog.get(product_id)
             
             if not product:
                 failed_products.append(product_id)
                 continue
-            
+            added_products.append(product)
+        
+        # Add everything in one atomic batch
+        operations = [
+            {"op": "add", "product_id": str(p['id']), "quantity": quantity}
+            for p in added_products
+        ]
+        if operations:
             try:
-                await add_to_cart(session_id, product_id, quantity=quantity)
-                added_products.append(product)
+                result = await apply_cart_operations(session_id, operations)
+                cart = result["cart"]
+                rejected = set(result["failed"])
+                failed_products.extend(rejected)
+                added_products = [p for p in added_products if str(p['id']) not in rejected]
             except Exception as e:
-                print(f"Failed to add product {product_id}: {e}")
-                failed_products.append(product_id)
-        
-        cart = await get_cart(session_id)
+                print(f"Failed to add products {product_ids}: {e}")
+                failed_products.extend(str(p['id']) for p in added_products)
+                added_products = []
+                cart = await get_cart(session_id)
+        else:
+            cart = await get_cart(session_id)
         
         if not added_products:
             return {
@@ -455,8 +334,8 @@ class ChatbotService:
                 "intent": "product_by_id"
             }
         
-        products = await get_products()
-        product = next((p for p in products if str(p['id']) == product_id), None)
+        catalog = await get_catalog()
+        product = catalog.get(product_id)
 
         if not product:
             return {
@@ -487,8 +366,8 @@ class ChatbotService:
         
         try:
             cart = await add_to_cart(session_id, product_id, quantity)
-            products = await get_products()
-            product = next((p for p in products if str(p['id']) == product_id), None)
+            catalog = await get_catalog()
+            product = catalog.get(product_id)
             
             if not product:
                 return {
@@ -518,7 +397,7 @@ class ChatbotService:
         try:
             # Query ChromaDB with proper where clause using $and operator
             results = self.collection.query(
-                query_embeddings=[create_embeddings([query])[0]],
+                query_embeddings=[await get_query_embedding(query)],
                 n_results=3,
                 where={
                     "$and": [
@@ -560,7 +439,7 @@ class ChatbotService:
     async def _handle_semantic_search(self, query: str) -> Dict[str, Any]:
         """Handle product search using ChromaDB."""
         try:
-            query_embedding = create_embeddings([query])[0]
+            query_embedding = await get_query_embedding(query)
             
             results = self.collection.query(
                 query_embeddings=[query_embedding],
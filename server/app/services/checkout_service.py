@@ -0,0 +1,104 @@
+import os
+import hashlib
+import time
+import uuid
+from typing import Any, Dict, Optional
+import orjson
+from redis.exceptions import RedisError
+from app.services.product_service import get_redis_client, ensure_product_summary, PRODUCT_SUMMARY_KEY
+from app.services.cart_service import CART_KEY
+from app.services.order_service import (
+    order_from_record, ORDER_KEY_PREFIX, ORDER_STREAM_KEY, ORDER_STATUS_TTL, ORDER_STREAM_MAXLEN, PENDING
+)
+from app.services.cart_scripts import run_script, NO_CATALOG, EMPTY, REPLAY
+from app.core.logging_config import log_error, log_info
+
+# Orders are recorded under checkout:<session_id>:<idempotency key> so a
+# retried submit returns the original order instead of placing another
+IDEMPOTENCY_KEY_PREFIX = "checkout:"
+IDEMPOTENCY_TTL = int(os.getenv("CHECKOUT_IDEMPOTENCY_TTL", "86400"))
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
+
+
+class EmptyCartError(ValueError):
+    """Raised when checking out a cart with no items."""
+
+
+class IdempotencyKeyReusedError(ValueError):
+    """Raised when an idempotency key is replayed with a different request."""
+
+
+def _fingerprint(details: Dict[str, Any]) -> str:
+    """Hash of the checkout request, to detect a key reused for another request."""
+    return hashlib.sha1(orjson.dumps(details, option=orjson.OPT_SORT_KEYS)).hexdigest()[:16]
+
+
+async def place_order(
+    session_id: str,
+    details: Dict[str, Any],
+    idempotency_key: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Place an order for the session's cart. The cart is snapshotted and
+    cleared, the order recorded and queued for the order worker in one
+    atomic step, so items added concurrently are never silently dropped
+    and a retry with the same idempotency key returns the original order
+    without placing another. Payment, inventory and confirmation happen
+    afterwards; poll get_order_status for the outcome.
+    Args:
+        session_id: User session identifier
+        details: Checkout request fields (email, address, ...)
+        idempotency_key: Client-chosen key identifying this checkout attempt
+    Returns:
+        dict: Order with order_id, items, totals, status and "replayed"
+    Raises:
+        EmptyCartError: If the cart has no items
+        IdempotencyKeyReusedError: If the key was used for a different request
+    """
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise ValueError(f"Idempotency-Key must be 1-{MAX_IDEMPOTENCY_KEY_LENGTH} characters")
+
+    order_id = f"ORD-{uuid.uuid4().hex[:8].upper()}"
+    fingerprint = _fingerprint(details)
+    # Without a key every call is a new attempt; the order is still recorded
+    key = f"{IDEMPOTENCY_KEY_PREFIX}{session_id}:{idempotency_key or order_id}"
+
+    try:
+        redis = await get_redis_client()
+        keys = [
+            f"{CART_KEY}{session_id}", PRODUCT_SUMMARY_KEY, key,
+            f"{ORDER_KEY_PREFIX}{order_id}", ORDER_STREAM_KEY
+        ]
+        args = [
+            order_id, fingerprint, IDEMPOTENCY_TTL, session_id, orjson.dumps(details),
+            time.time(), ORDER_STATUS_TTL, ORDER_STREAM_MAXLEN
+        ]
+        status, payload = await run_script(redis, "checkout", keys, args)
+        if status == NO_CATALOG and await ensure_product_summary():
+            status, payload = await run_script(redis, "checkout", keys, args)
+
+        if status == EMPTY:
+            raise EmptyCartError("Cannot checkout with empty cart")
+        if status == NO_CATALOG:
+            raise RuntimeError("Product catalog unavailable")
+
+        record = orjson.loads(payload)
+        if status == REPLAY and record["fingerprint"] != fingerprint:
+            raise IdempotencyKeyReusedError("Idempotency-Key was already used for a different checkout request")
+
+        order = order_from_record(session_id, record)
+        order["replayed"] = status == REPLAY
+        order["status"] = PENDING
+        if order["replayed"]:
+            order["status"] = await redis.hget(f"{ORDER_KEY_PREFIX}{order['order_id']}", "status") or PENDING
+
+        log_info("Checkout replayed" if order["replayed"] else "Order placed",
+                 session_id=session_id,
+                 order_id=order["order_id"],
+                 total=order["total"])
+
+        return order
+
+    except RedisError as e:
+        log_error(e, "Redis error during checkout", session_id=session_id)
+        raise
@@ -0,0 +1,134 @@
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Any, Optional
+import numpy as np
+
+
+# Upper bounds of the price facet buckets; the last bucket is open-ended
+PRICE_BUCKETS = [25.0, 50.0, 100.0, 250.0, 500.0]
+
+
+def product_price(product: Dict[str, Any]) -> float:
+    return float(product.get("price", 0) or 0)
+
+
+def product_rating(product: Dict[str, Any]) -> float:
+    rating = product.get("rating") or {}
+    return float(rating.get("rate", 0) or 0)
+
+
+class FacetIndex:
+    """
+    Precomputed range and facet index for filtering the catalog by
+    category, price and rating.
+    Prices and ratings are kept as sorted arrays so range bounds are two
+    bisects; categories are boolean bitsets. A query intersects the
+    bitsets and computes facet counts in the same pass.
+    """
+
+    def __init__(self, products: List[Dict[str, Any]]):
+        self.size = len(products)
+        self.prices = np.array([product_price(p) for p in products], dtype=np.float64)
+        self.ratings = np.array([product_rating(p) for p in products], dtype=np.float64)
+
+        self._price_order = np.argsort(self.prices, kind="stable")
+        self._sorted_prices = self.prices[self._price_order].tolist()
+        self._rating_order = np.argsort(self.ratings, kind="stable")
+        self._sorted_ratings = self.ratings[self._rating_order].tolist()
+
+        categories = [str(p.get("category", "")).lower() for p in products]
+        self.category_names = sorted(set(categories))
+        codes = {name: i for i, name in enumerate(self.category_names)}
+        self._category_codes = np.array([codes[c] for c in categories], dtype=np.int32)
+        self._category_bits: Dict[str, np.ndarray] = {
+            name: self._category_codes == code for name, code in codes.items()
+        }
+
+    def _range_bits(
+        self,
+        order: np.ndarray,
+        sorted_values: List[float],
+        low: Optional[float],
+        high: Optional[float],
+    ) -> Optional[np.ndarray]:
+        """Bitset of docs whose value lies in [low, high], or None if unbounded."""
+        if low is None and high is None:
+            return None
+        start = bisect_left(sorted_values, low) if low is not None else 0
+        end = bisect_right(sorted_values, high) if high is not None else len(sorted_values)
+        bits = np.zeros(self.size, dtype=bool)
+        bits[order[start:end]] = True
+        return bits
+
+    def _intersect(self, *bitsets: Optional[np.ndarray]) -> np.ndarray:
+        result = np.ones(self.size, dtype=bool)
+        for bits in bitsets:
+            if bits is not None:
+                result &= bits
+        return result
+
+    def query(
+        self,
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        min_rating: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Filter the catalog and compute facet counts.
+        Each facet is counted with every filter applied except its own, so
+        the UI can show how many results picking another value would give.
+        Args:
+            category: Category name (case-insensitive)
+            min_price: Inclusive lower price bound
+            max_price: Inclusive upper price bound
+            min_rating: Inclusive lower rating bound
+        Returns:
+            dict: Bitset of matching docs, their count and facet counts
+        """
+        if category is not None:
+            category_bits = self._category_bits.get(category.lower(), np.zeros(self.size, dtype=bool))
+        else:
+            category_bits = None
+        price_bits = self._range_bits(self._price_order, self._sorted_prices, min_price, max_price)
+        rating_bits = self._range_bits(self._rating_order, self._sorted_ratings, min_rating, None)
+
+        without_category = self._intersect(price_bits, rating_bits)
+        without_price = self._intersect(category_bits, rating_bits)
+        without_rating = self._intersect(category_bits, price_bits)
+        matched = without_category if category_bits is None else without_category & category_bits
+
+        category_counts = np.bincount(
+            self._category_codes[without_category], minlength=len(self.category_names)
+        )
+        price_counts = np.bincount(
+            np.searchsorted(PRICE_BUCKETS, self.prices[without_price], side="right"),
+            minlength=len(PRICE_BUCKETS) + 1
+        )
+        rating_floors = np.clip(self.ratings[without_rating].astype(np.int64), 0, 5)
+        rating_counts = np.bincount(rating_floors, minlength=6)
+
+        bounds = [0.0] + PRICE_BUCKETS
+        return {
+            "matched": matched,
+            "total": int(np.count_nonzero(matched)),
+            "facets": {
+                "category": {
+                    name: int(count)
+                    for name, count in zip(self.category_names, category_counts.tolist())
+                    if count
+                },
+                "price": [
+                    {
+                        "min": bounds[i],
+                        "max": PRICE_BUCKETS[i] if i < len(PRICE_BUCKETS) else None,
+                        "count": int(count),
+                    }
+                    for i, count in enumerate(price_counts.tolist())
+                ],
+                # Products rated at least N stars, for N = 1..5
+                "rating": {
+                    str(stars): int(rating_counts[stars:].sum())
+                    for stars in range(1, 6)
+                },
+            },
+        }
@@ -0,0 +1,214 @@
+import re
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+
+
+# Cue -> phrases. A cue is present when any of its phrases occurs anywhere
+# in the lowercased message (plain substring match, so "hi" also fires
+# inside "shipping" - this mirrors the original keyword checks).
+CUES: Dict[str, Tuple[str, ...]] = {
+    "greeting": ("hello", "hi", "hey", "good morning", "good afternoon", "good evening", "how are you"),
+    "clear_cart": ("clear cart", "empty cart", "remove everything", "delete everything", "clear my cart"),
+    "remove": ("remove", "delete", "take out"),
+    "cart": ("cart",),
+    "product": ("product",),
+    "add": ("add", "put"),
+    "add_to_cart": ("add product", "add item", "add this", "add to cart", "put in cart"),
+    "checkout": ("checkout",),
+    "checkout_phrase": ("checkout", "buy now", "purchase", "place order", "pay now", "proceed to checkout"),
+    "cart_query": ("my cart", "show cart", "view cart", "cart contents", "what's in my cart"),
+    "product_search": ("product", "item", "buy", "shop", "find", "show", "looking for", "need", "want",
+                       "price", "cost", "cheap", "expensive", "available"),
+}
+
+# ShopHub topic -> keywords; the first topic in this order with a match wins
+SHOPHUB_TOPICS: Dict[str, Tuple[str, ...]] = {
+    "shipping": ("shipping details", "ship"),
+    "returns": ("return", "returns"),
+    "refund": ("refund", "refunds"),
+    "delivery": ("delivery", "deliver"),
+    "warranty": ("warranty", "guarantee"),
+    "support": ("support", "help", "customer service", "service"),
+    "contact": ("contact",),
+    "policy": ("policy", "policies", "terms"),
+}
+
+TOPIC_CUE_PREFIX = "topic:"
+
+PRODUCT_REFERENCE_RE = re.compile(r'product\s*(?:id|#)?\s*(\d+)|id\s*:?\s*\d+')
+PRODUCT_LIST_RE = re.compile(r'products?\s+(\d+(?:\s*,?\s*(?:and\s+)?\d+)*)')
+NUMBER_RE = re.compile(r'\b(\d+)\b')
+DIGITS_RE = re.compile(r'\d+')
+# Tried in order; the first that matches gives the quantity
+QUANTITY_RES = [re.compile(p) for p in (
+    r'(\d+)\s+(?:of|x)\s+product',
+    r'(\d+)\s+products?',
+    r'(\d+)\s+items?',
+    r'add\s+(\d+)\s+',
+    r'put\s+(\d+)\s+',
+)]
+MAX_QUANTITY = 99
+
+# Intents whose handlers take product IDs / a quantity
+ID_INTENTS = frozenset({"remove_from_cart", "add_multiple_to_cart", "add_to_cart", "add_and_checkout", "product_by_id"})
+QUANTITY_INTENTS = frozenset({"add_multiple_to_cart", "add_to_cart", "add_and_checkout"})
+
+
+class MessageIntent(NamedTuple):
+    intent: str
+    product_ids: List[str]
+    quantity: int
+    topic: Optional[str]
+
+
+def _trie_pattern(phrases: List[str]) -> str:
+    """
+    Regex alternation of phrases factored into a character trie, e.g.
+    "add", "add item", "available" -> "a(?:dd(?: item)?|vailable)". Each
+    position then branches on the next character instead of trying every
+    phrase, and the greedy optional groups make it match the longest phrase.
+    """
+    trie: Dict[str, Any] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = f"(?:{'|'.join(branches)})"
+        return f"{group}?" if "" in node else group
+
+    return build(trie)
+
+
+def _build_matcher(cues: Dict[str, Tuple[str, ...]]) -> Tuple["re.Pattern[str]", Dict[str, FrozenSet[str]]]:
+    """
+    Compile every phrase into one pattern tried at each position of the
+    message (via a lookahead, so overlapping phrases are all seen). Only the
+    longest phrase starting at a position is reported, but any shorter
+    phrase matching there is a prefix of it, so each phrase maps to the
+    cues of all its phrase prefixes.
+    """
+    phrase_cues: Dict[str, set] = {}
+    for cue, phrases in cues.items():
+        for phrase in phrases:
+            phrase_cues.setdefault(phrase, set()).add(cue)
+
+    implied = {
+        phrase: frozenset(cue for other, names in phrase_cues.items() if phrase.startswith(other) for cue in names)
+        for phrase in phrase_cues
+    }
+    return re.compile(f"(?=({_trie_pattern(list(phrase_cues))}))"), implied
+
+
+_TOPIC_CUES = [(f"{TOPIC_CUE_PREFIX}{topic}", topic) for topic in SHOPHUB_TOPICS]
+_TOPIC_CUE_NAMES = frozenset(cue for cue, _ in _TOPIC_CUES)
+_MATCHER, _IMPLIED_CUES = _build_matcher({
+    **CUES,
+    **{cue: SHOPHUB_TOPICS[topic] for cue, topic in _TOPIC_CUES},
+})
+
+
+def find_cues(message: str) -> Set[str]:
+    """Return every cue present in a lowercased message, in one pass."""
+    found: Set[str] = set()
+    for phrase in _MATCHER.findall(message):
+        found |= _IMPLIED_CUES[phrase]
+    return found
+
+
+def extract_product_ids(message: str) -> List[str]:
+    """
+    Extract product IDs from a lowercased message, in order and without duplicates.
+    Handles: "Add product 5, 6, and 7", "products 1 2 3", "product 5 and 9"
+    """
+    matches = PRODUCT_LIST_RE.findall(message)
+    if matches:
+        product_ids = [n for match in matches for n in DIGITS_RE.findall(match)]
+    else:
+        product_ids = NUMBER_RE.findall(message)
+    return list(dict.fromkeys(product_ids))
+
+
+def extract_quantity(message: str) -> int:
+    """
+    Extract quantity from a lowercased message (default 1, at most MAX_QUANTITY).
+    Handles: "add 2 of product 5", "add 5 products", "put 3 items"
+    """
+    for pattern in QUANTITY_RES:
+        match = pattern.search(message)
+        if match:
+            return min(int(match.group(1)), MAX_QUANTITY)
+    return 1
+
+
+class _LazyIds:
+    """Product IDs extracted on first use, at most once per message."""
+
+    __slots__ = ("message", "ids")
+
+    def __init__(self, message: str):
+        self.message = message
+        self.ids: Optional[List[str]] = None
+
+    def get(self) -> List[str]:
+        if self.ids is None:
+            self.ids = extract_product_ids(self.message)
+        return self.ids
+
+
+def _intent(message: str, cues: Set[str], product_ids: _LazyIds) -> str:
+    """Apply the intent rules in priority order to the cues found."""
+    if "greeting" in cues:
+        return "greeting"
+    if "clear_cart" in cues:
+        return "clear_cart"
+    if "remove" in cues and ("cart" in cues or "product" in cues):
+        return "remove_from_cart"
+    # Multi-product add is checked before single add
+    if "add" in cues and len(product_ids.get()) > 1:
+        return "add_multiple_to_cart"
+    if "add_to_cart" in cues:
+        return "add_to_cart"
+    if "checkout" in cues and ("add" in cues or "product" in cues):
+        return "add_and_checkout"
+    if "checkout_phrase" in cues:
+        return "checkout"
+    if "cart_query" in cues or message.strip() == "cart":
+        return "cart_query"
+    if PRODUCT_REFERENCE_RE.search(message):
+        return "product_by_id"
+    # ShopHub info is checked before product search
+    if not cues.isdisjoint(_TOPIC_CUE_NAMES):
+        return "shophub_info"
+    if "product_search" in cues:
+        return "product_search"
+    return "unknown"
+
+
+def classify(message: str) -> MessageIntent:
+    """
+    Classify a chat message and extract its entities in a single pass.
+    Args:
+        message: User's message
+    Returns:
+        MessageIntent: intent, product IDs (for intents that act on
+            products), quantity (for add intents, else 1) and ShopHub topic
+            (for shophub_info, else None)
+    """
+    message = message.lower()
+    cues = find_cues(message)
+    product_ids = _LazyIds(message)
+    intent = _intent(message, cues, product_ids)
+
+    return MessageIntent(
+        intent=intent,
+        product_ids=product_ids.get() if intent in ID_INTENTS else [],
+        quantity=extract_quantity(message) if intent in QUANTITY_INTENTS else 1,
+        topic=next(topic for cue, topic in _TOPIC_CUES if cue in cues) if intent == "shophub_info" else None,
+    )
@@ -0,0 +1,155 @@
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+import orjson
+from app.services.product_service import get_redis_client
+from app.services.cart_service import cart_from_reply
+from app.core.logging_config import log_performance, log_info
+
+# Checkout records each order under order:<order_id> and appends its id to
+# the orders stream; the order worker (app/services/order_worker.py) then
+# runs the steps below outside the request.
+ORDER_KEY_PREFIX = "order:"
+ORDER_STREAM_KEY = "orders:stream"
+ORDER_DEAD_LETTER_KEY = "orders:dead"
+ORDER_GROUP = "order-workers"
+ORDER_STATUS_TTL = int(os.getenv("ORDER_STATUS_TTL", "604800"))
+# Approximate cap on stream length; keep it well above any expected backlog
+ORDER_STREAM_MAXLEN = int(os.getenv("ORDER_STREAM_MAXLEN", "100000"))
+
+TAX_RATE = 0.08
+FREE_SHIPPING_THRESHOLD = 50
+SHIPPING_FEE = 5.99
+
+# pending -> processing -> confirmed, or retrying until failed
+PENDING = "pending"
+PROCESSING = "processing"
+RETRYING = "retrying"
+CONFIRMED = "confirmed"
+FAILED = "failed"
+
+
+class OrderNotFoundError(LookupError):
+    """Raised when an order does not exist (or belongs to another session)."""
+
+
+async def process_payment(order: Dict[str, Any]):
+    """Charge the order total. Integrate the payment provider here."""
+    log_info("Payment processed", order_id=order["order_id"], total=order["total"])
+
+
+async def send_confirmation(order: Dict[str, Any]):
+    """Send the order confirmation email."""
+    log_info("Order confirmation sent", order_id=order["order_id"])
+
+
+async def reserve_inventory(order: Dict[str, Any]):
+    """Reserve stock for the ordered items."""
+    log_info("Inventory reserved", order_id=order["order_id"], item_count=order["item_count"])
+
+
+# Run in order. Each completed step is recorded on the order so a retry
+# resumes after it instead of, say, charging twice.
+ORDER_STEPS: List[Tuple[str, Callable[[Dict[str, Any]], Awaitable[None]]]] = [
+    ("payment", process_payment),
+    ("inventory", reserve_inventory),
+    ("confirmation", send_confirmation),
+]
+
+
+def calculate_totals(subtotal: float) -> Dict[str, float]:
+    """
+    Calculate tax, shipping and the order total for a cart subtotal.
+    Args:
+        subtotal: Cart total before tax and shipping
+    Returns:
+        dict: subtotal, tax, shipping and total
+    """
+    tax = round(subtotal * TAX_RATE, 2)
+    shipping = 0.00 if subtotal >= FREE_SHIPPING_THRESHOLD else SHIPPING_FEE
+    return {
+        "subtotal": subtotal,
+        "tax": tax,
+        "shipping": shipping,
+        "total": round(subtotal + tax + shipping, 2),
+    }
+
+
+def order_from_record(session_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    """Build an order from the record stored by the checkout script."""
+    cart = cart_from_reply(session_id, record["cart"])
+    return {
+        "order_id": record["order_id"],
+        "items": cart["items"],
+        "item_count": cart["item_count"],
+        **calculate_totals(cart["total"]),
+    }
+
+
+def _order_from_hash(fields: Dict[str, str]) -> Dict[str, Any]:
+    """Build the full order, with checkout details, from its stored hash."""
+    return {
+        **order_from_record(fields["session_id"], orjson.loads(fields["record"])),
+        "details": orjson.loads(fields.get("details") or "{}"),
+    }
+
+
+async def process_order(order_id: str):
+    """
+    Run the remaining order steps and mark the order confirmed.
+    Safe to call again for the same order: finished orders and completed
+    steps are skipped.
+    Args:
+        order_id: Order to process
+    Raises:
+        Exception: Whatever a step raised; the order is left for a retry
+    """
+    start_time = time.time()
+    redis = await get_redis_client()
+    key = f"{ORDER_KEY_PREFIX}{order_id}"
+
+    fields = await redis.hgetall(key)
+    if not fields or fields.get("status") in (CONFIRMED, FAILED):
+        return
+
+    attempts = await redis.hincrby(key, "attempts", 1)
+    await redis.hset(key, mapping={"status": PROCESSING, "updated_at": time.time()})
+    order = _order_from_hash(fields)
+
+    for name, step in ORDER_STEPS:
+        if fields.get(f"step:{name}"):
+            continue
+        await step(order)
+        await redis.hset(key, f"step:{name}", time.time())
+
+    await redis.hset(key, mapping={"status": CONFIRMED, "error": "", "updated_at": time.time()})
+    log_performance("order_processing", time.time() - start_time, order_id=order_id, attempts=attempts)
+
+
+async def get_order_status(order_id: str, session_id: str) -> Dict[str, Any]:
+    """
+    Get an order's processing status.
+    Args:
+        order_id: Order ID returned by checkout
+        session_id: Session that placed the order
+    Returns:
+        dict: order_id, status, total, item_count, attempts, error, created_at, updated_at
+    Raises:
+        OrderNotFoundError: If the order is unknown, expired or not this session's
+    """
+    redis = await get_redis_client()
+    fields = await redis.hgetall(f"{ORDER_KEY_PREFIX}{order_id}")
+    if not fields or fields.get("session_id") != session_id:
+        raise OrderNotFoundError(f"Order {order_id} not found")
+
+    order = _order_from_hash(fields)
+    return {
+        "order_id": order_id,
+        "status": fields["status"],
+        "total": order["total"],
+        "item_count": order["item_count"],
+        "attempts": int(fields.get("attempts", 0)),
+        "error": fields.get("error") or None,
+        "created_at": float(fields["created_at"]),
+        "updated_at": float(fields.get("updated_at", fields["created_at"])),
+    }
@@ -0,0 +1,191 @@
+"""
+Order worker: consumes the orders stream as part of the ORDER_GROUP
+consumer group and runs each order's steps (payment, inventory,
+confirmation).
+
+A failed order is left pending in the group and reclaimed for another
+attempt once it has been idle ORDER_RETRY_DELAY seconds; after
+ORDER_MAX_ATTEMPTS it is copied to the dead-letter stream, marked failed
+and acknowledged.
+
+Runs inside the API process by default (ORDER_WORKER_ENABLED), or on its
+own (from server/), reading .env, or .env.production when
+ENVIRONMENT=production, like the API:
+    python -m app.services.order_worker
+"""
+import os
+import asyncio
+import socket
+import time
+from typing import Any, Dict, Optional
+
+if __name__ == "__main__":
+    # Load before the app modules below read their settings
+    from dotenv import load_dotenv
+
+    if os.getenv("ENVIRONMENT", "development") == "production":
+        load_dotenv(".env.production")
+    else:
+        load_dotenv(".env")
+
+from redis.exceptions import RedisError, ResponseError
+from app.services.product_service import get_redis_client, close_redis
+from app.services.order_service import (
+    process_order, ORDER_KEY_PREFIX, ORDER_STREAM_KEY, ORDER_DEAD_LETTER_KEY, ORDER_GROUP,
+    RETRYING, FAILED
+)
+from app.core.logging_config import log_error, log_info, log_warning
+
+ORDER_WORKER_ENABLED = os.getenv("ORDER_WORKER_ENABLED", "true").lower() == "true"
+ORDER_MAX_ATTEMPTS = int(os.getenv("ORDER_MAX_ATTEMPTS", "5"))
+ORDER_RETRY_DELAY = int(os.getenv("ORDER_RETRY_DELAY", "30"))  # seconds
+ORDER_WORKER_BATCH = int(os.getenv("ORDER_WORKER_BATCH", "10"))
+# Must stay below the Redis client's 5s socket timeout
+ORDER_WORKER_BLOCK_MS = 2000
+
+_worker_task: Optional["asyncio.Task[None]"] = None
+_worker_stats = {
+    "processed": 0,
+    "retried": 0,
+    "dead_lettered": 0,
+}
+
+
+async def _ensure_group(redis: Any):
+    """Create the consumer group (and stream) if they do not exist yet."""
+    try:
+        await redis.xgroup_create(ORDER_STREAM_KEY, ORDER_GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def _handle(redis: Any, message_id: str, fields: Optional[Dict[str, str]]):
+    """Process one stream entry, acknowledging it unless it should be retried."""
+    if not fields:
+        # Trimmed from the stream while pending - nothing left to process
+        await redis.xack(ORDER_STREAM_KEY, ORDER_GROUP, message_id)
+        return
+
+    order_id = fields["order_id"]
+    key = f"{ORDER_KEY_PREFIX}{order_id}"
+    try:
+        await process_order(order_id)
+    except Exception as e:
+        attempts = int(await redis.hget(key, "attempts") or 0)
+        if attempts < ORDER_MAX_ATTEMPTS:
+            # Left unacknowledged; reclaimed after ORDER_RETRY_DELAY
+            await redis.hset(key, mapping={"status": RETRYING, "error": str(e), "updated_at": time.time()})
+            _worker_stats["retried"] += 1
+            log_warning("Order processing failed - will retry",
+                        order_id=order_id, attempts=attempts, error=str(e))
+            return
+
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(ORDER_DEAD_LETTER_KEY, {
+                "order_id": order_id,
+                "message_id": message_id,
+                "attempts": attempts,
+                "error": str(e),
+                "failed_at": time.time(),
+            })
+            pipe.hset(key, mapping={"status": FAILED, "error": str(e), "updated_at": time.time()})
+            pipe.xack(ORDER_STREAM_KEY, ORDER_GROUP, message_id)
+            await pipe.execute()
+        _worker_stats["dead_lettered"] += 1
+        log_error(e, "Order moved to dead-letter stream", order_id=order_id, attempts=attempts)
+        return
+
+    await redis.xack(ORDER_STREAM_KEY, ORDER_GROUP, message_id)
+    _worker_stats["processed"] += 1
+
+
+async def run_once(consumer: str, block_ms: Optional[int] = ORDER_WORKER_BLOCK_MS) -> int:
+    """
+    Retry orders left pending past ORDER_RETRY_DELAY, then read and process
+    new ones.
+    Args:
+        consumer: This worker's consumer name in the group
+        block_ms: How long to wait for new orders (None returns immediately)
+    Returns:
+        int: Number of stream entries handled
+    """
+    redis = await get_redis_client()
+    await _ensure_group(redis)
+
+    _, claimed, *_ = await redis.xautoclaim(
+        ORDER_STREAM_KEY, ORDER_GROUP, consumer,
+        min_idle_time=ORDER_RETRY_DELAY * 1000, start_id="0-0", count=ORDER_WORKER_BATCH
+    )
+    for message_id, fields in claimed:
+        await _handle(redis, message_id, fields)
+
+    response = await redis.xreadgroup(
+        ORDER_GROUP, consumer, {ORDER_STREAM_KEY: ">"}, count=ORDER_WORKER_BATCH, block=block_ms
+    )
+    handled = len(claimed)
+    for _, messages in response or []:
+        for message_id, fields in messages:
+            await _handle(redis, message_id, fields)
+        handled += len(messages)
+    return handled
+
+
+async def _worker_loop(consumer: str):
+    """Consume orders until cancelled."""
+    log_info("Order worker started", consumer=consumer)
+    while True:
+        try:
+            await run_once(consumer)
+        except asyncio.CancelledError:
+            raise
+        except RedisError as e:
+            log_error(e, "Redis error in order worker")
+            await asyncio.sleep(1)
+        except Exception as e:
+            log_error(e, "Unexpected error in order worker")
+            await asyncio.sleep(1)
+
+
+def _consumer_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def start_order_worker():
+    """Start the in-process order worker unless ORDER_WORKER_ENABLED is false."""
+    global _worker_task
+    if not ORDER_WORKER_ENABLED or _worker_task is not None:
+        return
+    _worker_task = asyncio.create_task(_worker_loop(_consumer_name()))
+
+
+async def stop_order_worker():
+    """Cancel the in-process order worker."""
+    global _worker_task
+    if _worker_task is None:
+        return
+    _worker_task.cancel()
+    try:
+        await _worker_task
+    except asyncio.CancelledError:
+        pass
+    _worker_task = None
+
+
+def get_order_worker_stats() -> Dict[str, Any]:
+    """Get this process's order worker counters."""
+    return {
+        **_worker_stats,
+        "running": _worker_task is not None and not _worker_task.done(),
+    }
+
+
+async def _main():
+    try:
+        await _worker_loop(_consumer_name())
+    finally:
+        await close_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
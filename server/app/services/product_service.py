@@ -1,19 +1,88 @@
 import os
+import asyncio
 import httpx
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable, Set
 import json
+import hashlib
+import orjson
 from redis import asyncio as aioredis
-from redis.exceptions import RedisError
+from redis.exceptions import RedisError, LockError
 import time
 from app.core.logging_config import log_performance, log_error, log_warning, log_info
+from app.core.http_client import get_with_retry, UPSTREAM_TIMEOUT, UPSTREAM_RETRY_BUDGET
+from app.core.circuit_breaker import CircuitBreaker
+from app.services.catalog import Catalog
+from app.services.catalog_codec import encode_blob, decode_blob, is_encoded, zstd_available, CODECS
+from app.services.catalog_snapshot import write_snapshot, read_snapshot, SnapshotError
 
 
 FAKE_STORE_URL = os.getenv("FAKE_STORE")
 REDIS_URL = os.getenv("REDIS_URL")
 CACHE_KEY = "products:all"
 CACHE_TTL = int(os.getenv("PRODUCTS_CACHE_TTL","31536000"))
+SOFT_TTL = int(os.getenv("PRODUCTS_SOFT_TTL", "3600"))
+VERSION_KEY = "products:version"
+FETCHED_AT_KEY = "products:fetched_at"
+# "blob": one JSON string; "hash": one hash field per product
+STORAGE_MODE = os.getenv("PRODUCTS_STORAGE", "blob").lower()
+PRODUCTS_HASH_KEY = "products:by_id"
+# id -> {"title", "price", "image"}; lets cart Lua scripts validate and price items
+PRODUCT_SUMMARY_KEY = "products:summary"
+PRODUCT_SUMMARY_VERSION_FIELD = "_version"
+# Blob encoding: "json" (plain text), "orjson", "zlib" or "zstd" (needs zstandard)
+BLOB_CODEC = os.getenv("PRODUCTS_CODEC", "json").lower()
+if BLOB_CODEC not in CODECS:
+    log_warning("Unknown PRODUCTS_CODEC - storing plain JSON", codec=BLOB_CODEC)
+    BLOB_CODEC = "json"
+elif BLOB_CODEC == "zstd" and not zstd_available():
+    log_warning("PRODUCTS_CODEC=zstd but zstandard is not installed - using zlib")
+    BLOB_CODEC = "zlib"
+VERSION_CHECK_INTERVAL = float(os.getenv("CATALOG_VERSION_CHECK_INTERVAL", "1.0"))
+REFRESH_LOCK_KEY = "products:refresh_lock"
+# The lock must outlive the slowest upstream fetch (UPSTREAM_RETRY_BUDGET)
+# and peers must wait at least that long, or a second worker fetches too
+REFRESH_MIN_MARGIN = 2.0
+REFRESH_LOCK_TTL = int(os.getenv("PRODUCTS_REFRESH_LOCK_TTL", str(max(30, int(UPSTREAM_RETRY_BUDGET) + 20))))
+REFRESH_WAIT_TIMEOUT = float(os.getenv("PRODUCTS_REFRESH_WAIT_TIMEOUT", str(UPSTREAM_RETRY_BUDGET + REFRESH_MIN_MARGIN)))
+if REFRESH_LOCK_TTL < UPSTREAM_RETRY_BUDGET + REFRESH_MIN_MARGIN:
+    log_warning("PRODUCTS_REFRESH_LOCK_TTL is shorter than UPSTREAM_RETRY_BUDGET - raising it",
+                lock_ttl=REFRESH_LOCK_TTL, retry_budget=UPSTREAM_RETRY_BUDGET)
+    REFRESH_LOCK_TTL = int(UPSTREAM_RETRY_BUDGET + REFRESH_MIN_MARGIN) + 1
+if REFRESH_WAIT_TIMEOUT < UPSTREAM_RETRY_BUDGET + REFRESH_MIN_MARGIN:
+    log_warning("PRODUCTS_REFRESH_WAIT_TIMEOUT is shorter than UPSTREAM_RETRY_BUDGET - raising it",
+                wait_timeout=REFRESH_WAIT_TIMEOUT, retry_budget=UPSTREAM_RETRY_BUDGET)
+    REFRESH_WAIT_TIMEOUT = UPSTREAM_RETRY_BUDGET + REFRESH_MIN_MARGIN
+REFRESH_POLL_INTERVAL = 0.1
+REFRESH_RETRY_INTERVAL = float(os.getenv("PRODUCTS_REFRESH_RETRY_INTERVAL", "30"))
+# Local copy of the last good catalog for cold starts; empty disables it
+SNAPSHOT_PATH = os.getenv("CATALOG_SNAPSHOT_PATH", "./catalog_snapshot.bin")
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("UPSTREAM_BREAKER_THRESHOLD", "3"))
+BREAKER_RECOVERY_TIMEOUT = float(os.getenv("UPSTREAM_BREAKER_RECOVERY", "30"))
 
 _redis_client: Optional[aioredis.Redis] = None
+_redis_binary_client: Optional[aioredis.Redis] = None
+_catalog: Optional[Catalog] = None
+_catalog_checked_at: float = 0.0
+_inflight_fetch: Optional["asyncio.Future[Tuple[List[Dict[str, Any]], str]]"] = None
+_fetch_stats: Dict[str, int] = {
+    "upstream_fetches": 0,
+    "coalesced_waiters": 0,
+    "lock_waits": 0,
+    "background_refreshes": 0,
+}
+_last_refresh_attempt: float = 0.0
+_snapshot_version: str = ""
+_snapshot_writing: str = ""
+# Newest catalog stored while a snapshot write was running; written next
+_snapshot_pending: Optional[Tuple[List[Dict[str, Any]], str]] = None
+# Called with the products and new version when this process stores a changed catalog
+_catalog_listeners: List[Callable[[List[Dict[str, Any]], str], Awaitable[Any]]] = []
+_listener_tasks: Set["asyncio.Task[Any]"] = set()
+_upstream_breaker = CircuitBreaker(
+    "fakestore",
+    failure_threshold=BREAKER_FAILURE_THRESHOLD,
+    recovery_timeout=BREAKER_RECOVERY_TIMEOUT
+)
 
 
 async def get_redis_client() -> aioredis.Redis:
@@ -40,9 +109,25 @@ async def get_redis_client() -> aioredis.Redis:
     return _redis_client
 
 
+async def get_redis_binary_client() -> aioredis.Redis:
+    """
+    Get or create a Redis client that returns raw bytes, for reading
+    codec-encoded catalog blobs.
+    """
+    global _redis_binary_client
+    if _redis_binary_client is None:
+        _redis_binary_client = await aioredis.from_url(
+            REDIS_URL,
+            decode_responses=False,
+            socket_connect_timeout=5,
+            socket_timeout=5
+        )
+    return _redis_binary_client
+
+
 async def close_redis():
     """Close Redis connection."""
-    global _redis_client
+    global _redis_client, _redis_binary_client
     if _redis_client:
         try:
             await _redis_client.close()
@@ -50,6 +135,142 @@ async def close_redis():
             log_info("Redis connection closed successfully")
         except Exception as e:
             log_error(e, "Error closing Redis connection")
+    if _redis_binary_client:
+        try:
+            await _redis_binary_client.close()
+            _redis_binary_client = None
+        except Exception as e:
+            log_error(e, "Error closing binary Redis connection")
+
+
+def _catalog_version(payload: str) -> str:
+    """Content hash of the serialized catalog, used as its version."""
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _is_stale(fetched_at: Optional[str]) -> bool:
+    """Check whether a cached catalog is past its soft TTL."""
+    try:
+        return time.time() - float(fetched_at or 0) > SOFT_TTL
+    except ValueError:
+        return True
+
+
+def _cache_key() -> str:
+    """Redis key holding the cached catalog for the configured storage mode."""
+    return PRODUCTS_HASH_KEY if STORAGE_MODE == "hash" else CACHE_KEY
+
+
+async def _read_cache(redis: aioredis.Redis) -> Tuple[Any, Optional[str], Optional[str]]:
+    """
+    Read the raw cached catalog, its version and fetch time in one round trip.
+    Blobs are read as bytes since they may be codec-encoded.
+    Returns:
+        Tuple[Any, Optional[str], Optional[str]]: Raw catalog (empty on miss), version, fetched_at.
+    """
+    if STORAGE_MODE == "hash":
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(PRODUCTS_HASH_KEY)
+            pipe.get(VERSION_KEY)
+            pipe.get(FETCHED_AT_KEY)
+            cached, version, fetched_at = await pipe.execute()
+        return cached, version, fetched_at
+
+    binary = await get_redis_binary_client()
+    async with binary.pipeline(transaction=False) as pipe:
+        pipe.get(CACHE_KEY)
+        pipe.get(VERSION_KEY)
+        pipe.get(FETCHED_AT_KEY)
+        cached, version, fetched_at = await pipe.execute()
+    return (
+        cached,
+        version.decode() if version is not None else None,
+        fetched_at.decode() if fetched_at is not None else None,
+    )
+
+
+def _decode_cache(cached: Any) -> List[Dict[str, Any]]:
+    """Decode a raw cached catalog read by _read_cache."""
+    if STORAGE_MODE == "hash":
+        products = [orjson.loads(value) for value in cached.values()]
+        products.sort(key=lambda p: p.get("id", 0))
+        return products
+    return decode_blob(cached)
+
+
+def _cached_version(cached: Any, products: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Derive a version for cache entries written without one."""
+    if STORAGE_MODE == "hash" or is_encoded(cached):
+        return _catalog_version(json.dumps(products if products is not None else _decode_cache(cached)))
+    return _catalog_version(cached.decode() if isinstance(cached, bytes) else cached)
+
+
+async def _write_cache(
+    redis: aioredis.Redis,
+    products: List[Dict[str, Any]],
+    payload: str,
+    version: str,
+    fetched_at: float,
+):
+    """
+    Write the catalog in the configured storage mode, with its version
+    and fetch time, in one transaction.
+    """
+    async with redis.pipeline(transaction=True) as pipe:
+        if STORAGE_MODE == "hash":
+            pipe.delete(PRODUCTS_HASH_KEY)
+            pipe.hset(PRODUCTS_HASH_KEY, mapping={str(p.get("id")): orjson.dumps(p) for p in products})
+            pipe.expire(PRODUCTS_HASH_KEY, CACHE_TTL)
+        else:
+            pipe.setex(CACHE_KEY, CACHE_TTL, encode_blob(products, payload, BLOB_CODEC))
+        _queue_product_summary(pipe, products)
+        pipe.setex(VERSION_KEY, CACHE_TTL, version)
+        pipe.setex(FETCHED_AT_KEY, CACHE_TTL, str(fetched_at))
+        await pipe.execute()
+
+
+def _queue_product_summary(pipe: Any, products: List[Dict[str, Any]]):
+    """Queue a rewrite of the product summary hash used by cart scripts."""
+    pipe.delete(PRODUCT_SUMMARY_KEY)
+    if not products:
+        return
+    summary = {
+        str(p.get("id")): orjson.dumps({
+            "title": p.get("title", ""),
+            "price": p.get("price", 0),
+            "image": p.get("image", ""),
+        })
+        for p in products
+    }
+    # Changes only when a price, title or image changes, so carts are
+    # repriced on that rather than on every catalog refresh
+    digest = hashlib.sha1()
+    for product_id, record in summary.items():
+        digest.update(product_id.encode("utf-8"))
+        digest.update(record)
+    summary[PRODUCT_SUMMARY_VERSION_FIELD] = digest.hexdigest()[:16]
+    pipe.hset(PRODUCT_SUMMARY_KEY, mapping=summary)
+    pipe.expire(PRODUCT_SUMMARY_KEY, CACHE_TTL)
+
+
+async def ensure_product_summary() -> bool:
+    """
+    Make sure the product summary hash exists, rebuilding it from the
+    catalog if it expired or predates it.
+    Returns:
+        bool: True if the hash is available
+    """
+    redis = await get_redis_client()
+    if await redis.exists(PRODUCT_SUMMARY_KEY):
+        return True
+    catalog = await get_catalog()
+    if not catalog.products:
+        return False
+    async with redis.pipeline(transaction=True) as pipe:
+        _queue_product_summary(pipe, catalog.products)
+        await pipe.execute()
+    log_info("Product summary hash rebuilt", count=len(catalog))
+    return True
 
 
 async def _fetch_from_api() -> List[Dict[str, Any]]:
@@ -64,40 +285,26 @@ async def _fetch_from_api() -> List[Dict[str, Any]]:
         raise error
     
     start_time = time.time()
-    timeout = httpx.Timeout(10.0)
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "application/json",
-        "Accept-Language": "en-US,en;q=0.9",
-    }
-    
 
     try:
-        async with httpx.AsyncClient(timeout=timeout, headers=headers, follow_redirects=True) as client:
-            response = await client.get(FAKE_STORE_URL)
-            log_info(
-                "FakeStore response",
-                status=response.status_code,
-                body=response.text[:300]
-            )
-            response.raise_for_status()
-            products = response.json()
-            
-            duration = time.time() - start_time
-            log_performance(
-                "external_api_fetch",
-                duration,
-                url=FAKE_STORE_URL,
-                status_code=response.status_code,
-                product_count=len(products)
-            )
-            return products
-            
+        response = await get_with_retry(FAKE_STORE_URL)
+        response.raise_for_status()
+        products = response.json()
+
+        duration = time.time() - start_time
+        log_performance(
+            "external_api_fetch",
+            duration,
+            url=FAKE_STORE_URL,
+            status_code=response.status_code,
+            product_count=len(products)
+        )
+        return products
+
     except httpx.TimeoutException as e:
         duration = time.time() - start_time
         log_performance("external_api_fetch", duration, status="timeout")
-        log_error(e, "External API timeout", url=FAKE_STORE_URL, timeout=10.0)
+        log_error(e, "External API timeout", url=FAKE_STORE_URL, timeout=UPSTREAM_TIMEOUT)
         return []
     except httpx.HTTPStatusError as e:
         duration = time.time() - start_time
@@ -116,13 +323,337 @@ async def _fetch_from_api() -> List[Dict[str, Any]]:
         return []
 
 
-async def get_products(force_refresh: bool = False) -> List[Dict[str, Any]]:
+async def _store_products(products: List[Dict[str, Any]]) -> str:
     """
-    Get product data with Redis caching.
+    Cache products in Redis, bump the catalog version and update the
+    on-disk snapshot (the last known good copy).
+    Args:
+        products: Products fetched from the API.
+    Returns:
+        str: New catalog version, or empty string if caching failed.
+    """
+    try:
+        redis = await get_redis_client()
+        payload = json.dumps(products)
+        version = _catalog_version(payload)
+        previous_version = await redis.get(VERSION_KEY)
+        await _write_cache(redis, products, payload, version, time.time())
+        log_info(
+            "Products cached in Redis",
+            count=len(products),
+            ttl=CACHE_TTL,
+            version=version,
+            storage=STORAGE_MODE,
+            codec=BLOB_CODEC
+        )
+        _save_snapshot(products, version)
+        if version != previous_version:
+            _notify_catalog_change(products, version)
+        return version
+    except Exception as e:
+        log_error(e, "Failed to cache products in Redis", product_count=len(products))
+        return ""
+
+
+def on_catalog_change(listener: Callable[[List[Dict[str, Any]], str], Awaitable[Any]]) -> None:
+    """
+    Register a coroutine function to run in the background with the
+    products and new version whenever this process stores a catalog whose
+    version changed. The products are passed because the in-process
+    catalog may not have been swapped yet when the listener runs.
+    Only the process that fetched the catalog calls it, so it runs once
+    per change across workers.
+    Args:
+        listener: Async callable taking the products and new catalog version
+    """
+    _catalog_listeners.append(listener)
+
+
+def _notify_catalog_change(products: List[Dict[str, Any]], version: str) -> None:
+    """Start the registered catalog change listeners."""
+    for listener in _catalog_listeners:
+        task = asyncio.ensure_future(listener(products, version))
+        _listener_tasks.add(task)
+        task.add_done_callback(_listener_done)
+
+
+def _listener_done(task: "asyncio.Task[Any]") -> None:
+    _listener_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        log_error(task.exception(), "Catalog change listener failed") # type: ignore
+
+
+def _save_snapshot(products: List[Dict[str, Any]], version: str) -> None:
+    """
+    Write the catalog snapshot off the event loop when the version changed.
+    The version is only recorded once the write succeeds, so a failed
+    write is retried on the next store.
+    """
+    global _snapshot_writing, _snapshot_pending
+    if not SNAPSHOT_PATH or version == _snapshot_version:
+        return
+    if _snapshot_writing:
+        # One write at a time (they share a temp file); the newest follows
+        if version != _snapshot_writing:
+            _snapshot_pending = (products, version)
+        return
+    _snapshot_writing = version
+
+    def write() -> int:
+        start_time = time.time()
+        size = write_snapshot(SNAPSHOT_PATH, products, version)
+        log_performance("catalog_snapshot_write", time.time() - start_time, bytes=size, version=version)
+        return size
+
+    def done(future: "asyncio.Future[int]") -> None:
+        global _snapshot_version, _snapshot_writing, _snapshot_pending
+        _snapshot_writing = ""
+        if future.cancelled():
+            pass
+        elif future.exception() is not None:
+            log_error(future.exception(), "Failed to write catalog snapshot", path=SNAPSHOT_PATH) # type: ignore
+        else:
+            _snapshot_version = version
+        pending, _snapshot_pending = _snapshot_pending, None
+        if pending is not None:
+            _save_snapshot(*pending)
+
+    asyncio.get_running_loop().run_in_executor(None, write).add_done_callback(done)
+
+
+async def load_catalog_snapshot() -> bool:
+    """
+    Load the on-disk catalog snapshot into the in-process catalog at startup.
+    If the Redis cache is empty it is seeded from the snapshot (marked
+    stale) and a background refresh reconciles it with the upstream.
+    Returns:
+        bool: True if a snapshot was loaded
+    """
+    global _catalog, _catalog_checked_at, _snapshot_version
+    if not SNAPSHOT_PATH:
+        return False
+
+    start_time = time.time()
+    products, version = await _read_snapshot_file()
+    if not products:
+        log_info("No catalog snapshot found", path=SNAPSHOT_PATH)
+        return False
+
+    _catalog = Catalog(products, version)
+    _snapshot_version = version
+    log_performance("catalog_snapshot_load", time.time() - start_time, product_count=len(products), version=version)
+
+    try:
+        redis = await get_redis_client()
+        if not await redis.exists(_cache_key()):
+            payload = json.dumps(products)
+            await _write_cache(redis, products, payload, version, 0)
+            _catalog_checked_at = time.time()
+            _schedule_background_refresh()
+    except RedisError as e:
+        log_error(e, "Redis unavailable - serving catalog snapshot")
+        _catalog_checked_at = time.time()
+    return True
+
+
+async def _read_snapshot_file() -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Read the on-disk catalog snapshot off the event loop.
+    Returns:
+        Tuple[List[Dict[str, Any]], str]: Products and version, or ([], "") if missing or unreadable.
+    """
+    if not SNAPSHOT_PATH:
+        return [], ""
+    try:
+        snapshot = await asyncio.get_running_loop().run_in_executor(None, read_snapshot, SNAPSHOT_PATH)
+    except (SnapshotError, OSError) as e:
+        log_error(e, "Ignoring unreadable catalog snapshot", path=SNAPSHOT_PATH)
+        return [], ""
+    return snapshot if snapshot is not None else ([], "")
+
+
+async def _last_known_good() -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Get the last catalog that was successfully fetched: the in-process
+    catalog, else the Redis cache however stale, else the on-disk
+    snapshot. The Redis cache is re-seeded from it (marked stale) if it
+    has expired.
+    Returns:
+        Tuple[List[Dict[str, Any]], str]: Products and catalog version, or ([], "") if none.
+    """
+    if _catalog is not None and _catalog.products:
+        products, version = _catalog.products, _catalog.version
+    else:
+        products, version = [], ""
+        try:
+            redis = await get_redis_client()
+            cached, cached_version, _ = await _read_cache(redis)
+            if cached:
+                products = _decode_cache(cached)
+                version = cached_version or _cached_version(cached, products)
+        except (RedisError, ValueError) as e:
+            log_error(e, "Failed to read cached catalog")
+        if not products:
+            products, version = await _read_snapshot_file()
+            if not products:
+                return [], ""
+
+    try:
+        redis = await get_redis_client()
+        # Only fill gaps - fetched_at=0 keeps it stale so refreshes are retried
+        if not await redis.exists(_cache_key()):
+            await _write_cache(redis, products, json.dumps(products), version, 0)
+    except RedisError as e:
+        log_error(e, "Failed to re-seed catalog cache")
+    log_warning("Serving last known good catalog", count=len(products), version=version)
+    return products, version
+
+
+async def _wait_for_peer_refresh(redis: aioredis.Redis) -> Optional[Tuple[List[Dict[str, Any]], str]]:
+    """
+    Wait for another process holding the refresh lock to finish and read
+    the catalog it cached.
+    Returns:
+        Optional[Tuple[List[Dict[str, Any]], str]]: Cached products and version, or None on timeout.
+    """
+    deadline = time.time() + REFRESH_WAIT_TIMEOUT
+    while time.time() < deadline:
+        await asyncio.sleep(REFRESH_POLL_INTERVAL)
+        if await redis.exists(REFRESH_LOCK_KEY):
+            continue
+        cached, version, _ = await _read_cache(redis)
+        if cached:
+            products = _decode_cache(cached)
+            return products, version or _cached_version(cached, products)
+        return None
+    return None
+
+
+async def _fetch_upstream() -> List[Dict[str, Any]]:
+    """Fetch from the API and record the outcome on the circuit breaker."""
+    try:
+        products = await _fetch_from_api()
+    except BaseException:
+        _upstream_breaker.record_failure()
+        raise
+    if products:
+        _upstream_breaker.record_success()
+    else:
+        _upstream_breaker.record_failure()
+    return products
+
+
+async def _refresh_from_upstream() -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Fetch products from the API and cache them, holding a Redis lock so
+    only one process hits the upstream at a time.
+    Returns:
+        Tuple[List[Dict[str, Any]], str]: Products and catalog version ("" if not cached).
+    """
+    global _last_refresh_attempt
+    _last_refresh_attempt = time.time()
+    lock = None
+    try:
+        redis = await get_redis_client()
+        lock = redis.lock(REFRESH_LOCK_KEY, timeout=REFRESH_LOCK_TTL)
+        if not await lock.acquire(blocking=False):
+            lock = None
+            _fetch_stats["lock_waits"] += 1
+            log_info("Catalog refresh in progress in another worker - waiting for it")
+            cached = await _wait_for_peer_refresh(redis)
+            if cached is not None:
+                return cached
+            log_warning("Peer catalog refresh did not populate the cache - fetching directly")
+    except RedisError as e:
+        log_error(e, "Redis error acquiring refresh lock - fetching without lock")
+        lock = None
+    
+    try:
+        if not _upstream_breaker.allow_request():
+            # Fail fast while the upstream is known to be down
+            log_warning("Upstream circuit open - skipping catalog fetch", breaker=_upstream_breaker.state)
+            return await _last_known_good()
+
+        _fetch_stats["upstream_fetches"] += 1
+        products = await _fetch_upstream()
+        if not products:
+            log_warning("No products returned from external API - keeping last known good catalog")
+            return await _last_known_good()
+        return products, await _store_products(products)
+    finally:
+        if lock is not None:
+            try:
+                await lock.release()
+            except (LockError, RedisError) as e:
+                log_warning("Failed to release catalog refresh lock", error=str(e))
+
+
+async def _fetch_coalesced() -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Single-flight wrapper around the upstream refresh.
+    Concurrent callers in this process share one in-flight fetch.
+    Returns:
+        Tuple[List[Dict[str, Any]], str]: Products and catalog version ("" if not cached).
+    """
+    if _inflight_fetch is not None and not _inflight_fetch.done():
+        _fetch_stats["coalesced_waiters"] += 1
+        return await asyncio.shield(_inflight_fetch)
+    
+    # Shield so a cancelled caller does not cancel the fetch other waiters share
+    return await asyncio.shield(_start_fetch())
+
+
+def _start_fetch() -> "asyncio.Future[Tuple[List[Dict[str, Any]], str]]":
+    """Start the shared upstream refresh task."""
+    global _inflight_fetch
+    _inflight_fetch = asyncio.ensure_future(_refresh_from_upstream())
+    _inflight_fetch.add_done_callback(_log_fetch_failure)
+    return _inflight_fetch
+
+
+def _log_fetch_failure(task: "asyncio.Future[Any]") -> None:
+    """Log failures of refresh tasks that may have no awaiting caller."""
+    if not task.cancelled() and task.exception() is not None:
+        log_error(task.exception(), "Catalog refresh task failed") # type: ignore
+
+
+def _log_warm_failure(future: "asyncio.Future[Any]") -> None:
+    """Log failures of background catalog index builds."""
+    if not future.cancelled() and future.exception() is not None:
+        log_error(future.exception(), "Failed to build catalog indexes") # type: ignore
+
+
+def _schedule_background_refresh() -> None:
+    """Refresh a stale catalog in the background (stale-while-revalidate)."""
+    if _inflight_fetch is not None and not _inflight_fetch.done():
+        return
+    if time.time() - _last_refresh_attempt < REFRESH_RETRY_INTERVAL:
+        return
+    log_info("Catalog past soft TTL - refreshing in background", soft_ttl=SOFT_TTL)
+    _fetch_stats["background_refreshes"] += 1
+    _start_fetch()
+
+
+def get_breaker_stats() -> Dict[str, Any]:
+    """Get upstream circuit breaker state and trip counts."""
+    return _upstream_breaker.stats()
+
+
+def get_fetch_stats() -> Dict[str, Any]:
+    """Get upstream fetch counters (actual fetches vs coalesced waiters)."""
+    return {
+        **_fetch_stats,
+        "fetch_in_flight": _inflight_fetch is not None and not _inflight_fetch.done(),
+    }
+
+
+async def _load_products(force_refresh: bool = False) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Load product data and its catalog version from Redis or the API.
     Args:
         force_refresh: If True, bypass cache and fetch fresh data.
     Returns:
-        List[Dict[str, Any]]: List of product dictionaries from Redis cache or API.
+        Tuple[List[Dict[str, Any]], str]: Products and catalog version ("" if not cached).
     """
     start_time = time.time()
     
@@ -132,9 +663,15 @@ async def get_products(force_refresh: bool = False) -> List[Dict[str, Any]]:
         # Try Redis cache first unless force refresh
         if not force_refresh:
             try:
-                cached_data = await redis.get(CACHE_KEY)
-                if cached_data:
-                    products = json.loads(cached_data)
+                cached, version, fetched_at = await _read_cache(redis)
+                if cached:
+                    if _is_stale(fetched_at):
+                        _schedule_background_refresh()
+                    if _catalog is not None and version and _catalog.version == version:
+                        # Local catalog already holds this version - skip decoding
+                        return _catalog.products, version
+                    products = _decode_cache(cached)
+                    version = version or _cached_version(cached, products)
                     duration = time.time() - start_time
                     log_performance(
                         "get_products",
@@ -143,57 +680,102 @@ async def get_products(force_refresh: bool = False) -> List[Dict[str, Any]]:
                         product_count=len(products)
                     )
                     log_info("Products retrieved from Redis cache", count=len(products))
-                    return products
-            except json.JSONDecodeError as e:
+                    return products, version
+            except ValueError as e:
                 log_error(e, "Failed to decode cached products from Redis")
         
-        # Cache miss or force refresh - fetch from API
+        # Cache miss or force refresh - fetch from API (coalesced)
         log_info("Fetching products from external API", force_refresh=force_refresh)
-        products = await _fetch_from_api()
+        products, version = await _fetch_coalesced()
         
-        if products:
-            try:
-                # Store in Redis with TTL
-                await redis.setex(
-                    CACHE_KEY,
-                    CACHE_TTL,
-                    json.dumps(products)
-                )
-                duration = time.time() - start_time
-                log_performance(
-                    "get_products",
-                    duration,
-                    source="external_api",
-                    product_count=len(products),
-                    cached=True
-                )
-                log_info(
-                    "Products cached in Redis",
-                    count=len(products),
-                    ttl=CACHE_TTL
-                )
-            except Exception as e:
-                log_error(e, "Failed to cache products in Redis", product_count=len(products))
-        else:
-            log_warning("No products returned from external API")
-        
-        return products
+        duration = time.time() - start_time
+        log_performance(
+            "get_products",
+            duration,
+            source="external_api",
+            product_count=len(products),
+            cached=bool(version)
+        )
+        return products, version
         
     except RedisError as e:
         duration = time.time() - start_time
+        if _catalog is not None:
+            log_performance("get_products", duration, source="local_catalog", status="redis_error")
+            log_error(e, "Redis error - serving in-process catalog")
+            return _catalog.products, _catalog.version
         log_performance("get_products", duration, source="fallback_api", status="redis_error")
         log_error(e, "Redis error - falling back to direct API call")
-        return await _fetch_from_api()
+        return await _fetch_coalesced()
     except Exception as e:
         duration = time.time() - start_time
         log_performance("get_products", duration, status="failed")
         log_error(e, "Unexpected error in get_products")
-        return []
+        return [], ""
+
+
+async def get_catalog(force_refresh: bool = False) -> Catalog:
+    """
+    Get the in-process product catalog, reloading it only when the
+    catalog version in Redis changes. Past the soft TTL the current
+    catalog is served while a background task refreshes it.
+    Args:
+        force_refresh: If True, bypass caches and fetch fresh data.
+    Returns:
+        Catalog: Decoded catalog with id and category indexes.
+    """
+    global _catalog, _catalog_checked_at
+    
+    if not force_refresh and _catalog is not None:
+        # Version checks are throttled so hot paths skip Redis entirely
+        if time.time() - _catalog_checked_at < VERSION_CHECK_INTERVAL:
+            return _catalog
+        try:
+            redis = await get_redis_client()
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.get(VERSION_KEY)
+                pipe.get(FETCHED_AT_KEY)
+                version, fetched_at = await pipe.execute()
+            if version == _catalog.version:
+                _catalog_checked_at = time.time()
+                if _is_stale(fetched_at):
+                    _schedule_background_refresh()
+                return _catalog
+        except RedisError as e:
+            log_error(e, "Redis error checking catalog version - serving in-process catalog")
+            return _catalog
+    
+    products, version = await _load_products(force_refresh)
+    
+    if _catalog is not None and version and _catalog.version == version:
+        _catalog_checked_at = time.time()
+        return _catalog
+    
+    catalog = Catalog(products, version)
+    if version:
+        _catalog = catalog
+        _catalog_checked_at = time.time()
+        log_info("In-process catalog loaded", count=len(catalog), version=version)
+        # Build search and other derived indexes off the event loop
+        asyncio.get_running_loop().run_in_executor(None, catalog.warm).add_done_callback(_log_warm_failure)
+    return catalog
+
+
+async def get_products(force_refresh: bool = False) -> List[Dict[str, Any]]:
+    """
+    Get product data with Redis caching.
+    Args:
+        force_refresh: If True, bypass cache and fetch fresh data.
+    Returns:
+        List[Dict[str, Any]]: List of product dictionaries from Redis cache or API.
+    """
+    catalog = await get_catalog(force_refresh)
+    return catalog.products
 
 
 async def get_product_by_id(product_id: int) -> Optional[Dict[str, Any]]:
     """
-    Get a specific product by ID from Redis cache.
+    Get a specific product by ID.
     Args:
         product_id: The product ID to retrieve.
     Returns:
@@ -202,60 +784,17 @@ async def get_product_by_id(product_id: int) -> Optional[Dict[str, Any]]:
     start_time = time.time()
     
     try:
-        redis = await get_redis_client()
-        product_key = f"product:{product_id}"
-        
-        # Try individual product cache first
-        try:
-            cached_product = await redis.get(product_key)
-            if cached_product:
-                product = json.loads(cached_product)
-                duration = time.time() - start_time
-                log_performance(
-                    "get_product_by_id",
-                    duration,
-                    product_id=product_id,
-                    source="redis_cache"
-                )
-                return product
-        except json.JSONDecodeError as e:
-            log_error(e, "Failed to decode cached product", product_id=product_id)
-        
-        # If not in individual cache, search in main products cache
-        products = await get_products()
-        product = next((p for p in products if p.get("id") == product_id), None)
+        product = (await get_catalog()).get(product_id)
         
+        duration = time.time() - start_time
         if product:
-            try:
-                # Cache individual product for faster future lookups
-                await redis.setex(
-                    product_key,
-                    CACHE_TTL,
-                    json.dumps(product)
-                )
-                duration = time.time() - start_time
-                log_performance(
-                    "get_product_by_id",
-                    duration,
-                    product_id=product_id,
-                    source="products_cache",
-                    cached=True
-                )
-            except Exception as e:
-                log_error(e, "Failed to cache individual product", product_id=product_id)
+            log_performance("get_product_by_id", duration, product_id=product_id)
         else:
-            duration = time.time() - start_time
             log_performance("get_product_by_id", duration, product_id=product_id, found=False)
             log_warning("Product not found", product_id=product_id)
         
         return product
         
-    except RedisError as e:
-        duration = time.time() - start_time
-        log_performance("get_product_by_id", duration, product_id=product_id, status="redis_error")
-        log_error(e, "Redis error in get_product_by_id", product_id=product_id)
-        products = await get_products()
-        return next((p for p in products if p.get("id") == product_id), None)
     except Exception as e:
         duration = time.time() - start_time
         log_performance("get_product_by_id", duration, product_id=product_id, status="failed")
@@ -265,17 +804,21 @@ async def get_product_by_id(product_id: int) -> Optional[Dict[str, Any]]:
 
 async def clear_cache():
     """Clear the product cache in Redis."""
+    global _catalog
     start_time = time.time()
     
     try:
         redis = await get_redis_client()
         
-        # Delete main products cache
-        await redis.delete(CACHE_KEY)
+        # Delete products cache (both storage modes) and its version so every
+        # worker reloads. The on-disk snapshot is kept as a fallback.
+        deleted_count = await redis.delete(
+            CACHE_KEY, PRODUCTS_HASH_KEY, PRODUCT_SUMMARY_KEY, VERSION_KEY, FETCHED_AT_KEY
+        )
+        _catalog = None
         
-        # Delete all individual product caches
+        # Delete legacy individual product caches
         cursor = 0
-        deleted_count = 0
         while True:
             cursor, keys = await redis.scan(cursor, match="product:*", count=100)
             if keys:
@@ -285,8 +828,8 @@ async def clear_cache():
                 break
         
         duration = time.time() - start_time
-        log_performance("clear_cache", duration, keys_deleted=deleted_count + 1)
-        log_info("Redis cache cleared", keys_deleted=deleted_count + 1)
+        log_performance("clear_cache", duration, keys_deleted=deleted_count)
+        log_info("Redis cache cleared", keys_deleted=deleted_count)
         
     except RedisError as e:
         duration = time.time() - start_time
@@ -0,0 +1,136 @@
+import re
+import math
+import heapq
+from bisect import bisect_left
+from collections import Counter
+from typing import List, Dict, Any, Tuple
+import numpy as np
+
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOP_WORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+    "it", "of", "on", "or", "that", "the", "this", "to", "with", "your", "you",
+})
+
+# Field weights: a title match counts more than a description match
+TITLE_WEIGHT = 3
+CATEGORY_WEIGHT = 2
+DESCRIPTION_WEIGHT = 1
+
+# Prefix expansions score lower than exact terms and are capped per token
+PREFIX_WEIGHT = 0.6
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_EXPANSIONS = 50
+
+# Queries touching fewer postings are scored with a dict and heap;
+# larger ones are accumulated with NumPy over the whole doc space
+VECTORIZE_THRESHOLD = 2048
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase and split text into alphanumeric tokens, dropping stop words."""
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOP_WORDS]
+
+
+class SearchIndex:
+    """
+    Inverted index over product title, category and description with
+    BM25 scoring and prefix matching.
+    Per-posting BM25 weights are precomputed at build time into NumPy
+    arrays, so a query is only array additions and a top-k selection.
+    """
+
+    def __init__(self, products: List[Dict[str, Any]], k1: float = 1.2, b: float = 0.75):
+        self.products = products
+        term_freqs: List[Counter] = []
+
+        for product in products:
+            tf: Counter = Counter()
+            for token in tokenize(str(product.get("title", ""))):
+                tf[token] += TITLE_WEIGHT
+            for token in tokenize(str(product.get("category", ""))):
+                tf[token] += CATEGORY_WEIGHT
+            for token in tokenize(str(product.get("description", ""))):
+                tf[token] += DESCRIPTION_WEIGHT
+            term_freqs.append(tf)
+
+        doc_count = len(products)
+        avg_len = (sum(sum(tf.values()) for tf in term_freqs) / doc_count) if doc_count else 0.0
+
+        doc_freq: Counter = Counter()
+        for tf in term_freqs:
+            doc_freq.update(tf.keys())
+
+        idf = {
+            term: math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+        docs_by_term: Dict[str, List[int]] = {}
+        weights_by_term: Dict[str, List[float]] = {}
+        for doc, tf in enumerate(term_freqs):
+            norm = k1 * (1 - b + b * (sum(tf.values()) / avg_len)) if avg_len else k1
+            for term, freq in tf.items():
+                docs_by_term.setdefault(term, []).append(doc)
+                weights_by_term.setdefault(term, []).append(idf[term] * (freq * (k1 + 1)) / (freq + norm))
+
+        # term -> (doc indexes, precomputed BM25 weights)
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            term: (np.array(docs, dtype=np.int32), np.array(weights_by_term[term], dtype=np.float32))
+            for term, docs in docs_by_term.items()
+        }
+        self.vocabulary = sorted(self.postings)
+        # Tiny per-doc offsets make scores unique: ties go to the earlier
+        # product and argpartition avoids its slow path on repeated values
+        self._tiebreak = np.arange(doc_count, dtype=np.float64) * -1e-12
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        """Get (term, weight multiplier) pairs matching a query token exactly or by prefix."""
+        terms = [(token, 1.0)] if token in self.postings else []
+        if len(token) < MIN_PREFIX_LENGTH:
+            return terms
+
+        start = bisect_left(self.vocabulary, token)
+        for term in self.vocabulary[start:start + MAX_PREFIX_EXPANSIONS + 1]:
+            if not term.startswith(token):
+                break
+            if term != token:
+                terms.append((term, PREFIX_WEIGHT))
+        return terms
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Search products ranked by BM25.
+        Args:
+            query: Free-text query
+            limit: Maximum number of results
+        Returns:
+            List[Dict[str, Any]]: Top matching products, best first
+        """
+        matches = [
+            (self.postings[term], multiplier)
+            for token in set(tokenize(query))
+            for term, multiplier in self._expand(token)
+        ]
+        if not matches:
+            return []
+
+        if sum(len(docs) for (docs, _), _ in matches) < VECTORIZE_THRESHOLD:
+            scores: Dict[int, float] = {}
+            for (docs, weights), multiplier in matches:
+                for doc, weight in zip(docs.tolist(), weights.tolist()):
+                    scores[doc] = scores.get(doc, 0.0) + weight * multiplier
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+            return [self.products[doc] for doc, _ in top]
+
+        all_docs = np.concatenate([docs for (docs, _), _ in matches])
+        all_weights = np.concatenate([weights * multiplier for (_, weights), multiplier in matches])
+        totals = np.bincount(all_docs, weights=all_weights, minlength=len(self.products))
+        k = min(limit, int(np.count_nonzero(totals)))
+        if k == 0:
+            return []
+        totals += self._tiebreak
+        top = np.argpartition(totals, -k)[-k:]
+        top = top[np.argsort(-totals[top])]
+        return [self.products[doc] for doc in top.tolist()]
@@ -0,0 +1,76 @@
+"""
+Compare catalog blob codecs: bytes stored in Redis, bytes transferred
+per get_products() cache read, and encode/decode time per call. Encode
+time starts from the product list, so every codec includes the
+json.dumps that the cache write does anyway for the catalog version.
+
+Usage (from server/):
+    python -m benchmarks.bench_catalog_codec --sizes 1000,10000,100000
+    python -m benchmarks.bench_catalog_codec --redis-url redis://localhost:6379/15
+
+With --redis-url each blob is also written to that Redis database to
+report MEMORY USAGE and the GET round-trip time.
+"""
+import argparse
+import json
+import time
+from typing import List, Optional
+
+from app.services.catalog_codec import encode_blob, decode_blob, zstd_available, CODECS
+from benchmarks.catalog_generator import generate_products
+
+
+BENCH_KEY = "bench:products:all"
+
+
+def per_call(fn, repeat: int) -> float:
+    """Return mean milliseconds per call."""
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main(sizes: List[int], repeat: int, redis_url: Optional[str]):
+    redis = None
+    if redis_url:
+        import redis as redis_sync
+        redis = redis_sync.Redis.from_url(redis_url)
+
+    codecs = [c for c in CODECS if c != "zstd" or zstd_available()]
+    header = f"{'products':>10} {'codec':>7} {'wire bytes':>12} {'ratio':>6} {'encode ms':>10} {'decode ms':>10}"
+    if redis is not None:
+        header += f" {'redis bytes':>12} {'GET ms':>8}"
+    print(header)
+
+    for size in sizes:
+        products = generate_products(size)
+        payload = json.dumps(products)
+        baseline = len(payload.encode("utf-8"))
+        for codec in codecs:
+            blob = encode_blob(products, payload, codec)
+            raw = blob.encode("utf-8") if isinstance(blob, str) else blob
+            encode_ms = per_call(lambda: encode_blob(products, json.dumps(products), codec), repeat)
+            decode_ms = per_call(lambda: decode_blob(raw), repeat)
+            line = f"{size:>10} {codec:>7} {len(raw):>12} {baseline / len(raw):>5.1f}x {encode_ms:>10.2f} {decode_ms:>10.2f}"
+            if redis is not None:
+                redis.set(BENCH_KEY, raw)
+                stored = redis.memory_usage(BENCH_KEY) or 0
+                get_ms = per_call(lambda: redis.get(BENCH_KEY), repeat)
+                line += f" {stored:>12} {get_ms:>8.2f}"
+            print(line)
+
+    if redis is not None:
+        redis.delete(BENCH_KEY)
+    if not zstd_available():
+        print("zstd skipped: install zstandard to include it")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated catalog sizes")
+    parser.add_argument("--repeat", type=int, default=20, help="Calls per measurement")
+    parser.add_argument("--redis-url", default=None, help="Redis to measure stored bytes and GET time against")
+    args = parser.parse_args()
+    main([int(s) for s in args.sizes.split(",")], args.repeat, args.redis_url)
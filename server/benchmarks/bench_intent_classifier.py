@@ -0,0 +1,170 @@
+"""
+Compare chatbot intent classification throughput: the original sequential
+keyword scans vs the compiled single-pass classifier. Both classify the
+same synthetic chat messages; any disagreement is reported.
+
+Usage (from server/):
+    python -m benchmarks.bench_intent_classifier --messages 20000
+"""
+import argparse
+import random
+import re
+import time
+from typing import Any, Callable, List, Tuple
+
+from app.services.intent_classifier import classify, SHOPHUB_TOPICS, ID_INTENTS
+
+
+TEMPLATES = [
+    "hello there", "hi!", "good morning, how are you", "hey e-vee",
+    "clear my cart", "empty cart please", "remove everything",
+    "remove product {a} from cart", "delete product {a}", "take out product {a} and {b} from my cart",
+    "add product {a} to cart", "add products {a}, {b} and {c}", "put {q} of product {a} in cart",
+    "add {q} items of product {a}", "add this to cart", "put product {a} and {b} in cart",
+    "add product {a} and checkout", "checkout", "proceed to checkout", "buy now", "place order",
+    "show cart", "what's in my cart", "cart", "view cart contents",
+    "tell me about product {a}", "product #{a}", "id: {a}", "details for product id {a}",
+    "what is your return policy", "do you offer free shipping details", "how long is delivery",
+    "can I get a refund", "is there a warranty", "contact customer service", "terms of use",
+    "looking for a wireless headset", "I need a gold ring", "find cheap jackets under 50",
+    "what products are available", "show me something expensive", "i want a dress",
+    "recommend a laptop for travel", "blue cotton t-shirt", "xyz", "ok thanks",
+]
+
+
+def generate_messages(count: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        text = rng.choice(TEMPLATES).format(
+            a=rng.randint(1, 500), b=rng.randint(1, 500), c=rng.randint(1, 500), q=rng.randint(1, 9)
+        )
+        messages.append(text.capitalize() if rng.random() < 0.5 else text)
+    return messages
+
+
+class LegacyClassifier:
+    """The original ChatbotService intent detection and entity extraction, kept as a baseline."""
+
+    SHOPHUB_TOPICS = {topic: list(keywords) for topic, keywords in SHOPHUB_TOPICS.items()}
+
+    def _detect_shophub_topic(self, message: str):
+        message_lower = message.lower()
+        for topic, keywords in self.SHOPHUB_TOPICS.items():
+            if any(keyword in message_lower for keyword in keywords):
+                return topic
+        return None
+
+    def classify(self, message: str) -> Tuple[str, List[str], int, Any]:
+        message_lower = message.lower()
+        intent = self._detect_intent(message_lower)
+        product_ids = self._extract_product_ids(message) if any(
+            keyword in intent for keyword in ["add", "remove", "cart", "checkout", "product"]
+        ) else []
+        quantity = self._extract_quantity(message) if "add" in intent else 1
+        topic = self._detect_shophub_topic(message_lower) if intent == "shophub_info" else None
+        return intent, product_ids, quantity, topic
+
+    def _detect_intent(self, message: str) -> str:
+        if any(greet in message for greet in ["hello", "hi", "hey", "good morning", "good afternoon", "good evening", "how are you"]):
+            return "greeting"
+        if any(phrase in message for phrase in ["clear cart", "empty cart", "remove everything", "delete everything", "clear my cart"]):
+            return "clear_cart"
+        if any(phrase in message for phrase in ["remove", "delete", "take out"]) and ("cart" in message or "product" in message):
+            return "remove_from_cart"
+        if ("add" in message or "put" in message) and len(self._extract_product_ids(message)) > 1:
+            return "add_multiple_to_cart"
+        if any(phrase in message for phrase in ["add product", "add item", "add this", "add to cart", "put in cart"]):
+            return "add_to_cart"
+        if "checkout" in message and any(word in message for word in ["add", "put", "product"]):
+            return "add_and_checkout"
+        if any(phrase in message for phrase in ["checkout", "buy now", "purchase", "place order", "pay now", "proceed to checkout"]):
+            return "checkout"
+        if any(phrase in message for phrase in ["my cart", "show cart", "view cart", "cart contents", "what's in my cart"]) or message.strip() == "cart":
+            return "cart_query"
+        if re.search(r'product\s*(?:id|#)?\s*(\d+)', message) or re.search(r'id\s*:?\s*\d+', message):
+            return "product_by_id"
+        if self._detect_shophub_topic(message):
+            return "shophub_info"
+        product_keywords = ["product", "item", "buy", "shop", "find", "show", "looking for", "need", "want", "price", "cost", "cheap", "expensive", "available"]
+        if any(keyword in message for keyword in product_keywords):
+            return "product_search"
+        return "unknown"
+
+    def _extract_product_ids(self, message: str) -> List[str]:
+        pattern1 = r'products?\s+(\d+(?:\s*,?\s*(?:and\s+)?\d+)*)'
+        pattern2 = r'\b(\d+)\b'
+        matches = re.findall(pattern1, message.lower())
+        product_ids = []
+        if matches:
+            for match in matches:
+                product_ids.extend(re.findall(r'\d+', match))
+        else:
+            product_ids = re.findall(pattern2, message)
+        seen = set()
+        unique_ids = []
+        for pid in product_ids:
+            if pid not in seen:
+                seen.add(pid)
+                unique_ids.append(pid)
+        return unique_ids
+
+    def _extract_quantity(self, message: str) -> int:
+        patterns = [
+            r'(\d+)\s+(?:of|x)\s+product',
+            r'(\d+)\s+products?',
+            r'(\d+)\s+items?',
+            r'add\s+(\d+)\s+',
+            r'put\s+(\d+)\s+',
+        ]
+        for pattern in patterns:
+            match = re.search(pattern, message.lower())
+            if match:
+                return min(int(match.group(1)), 99)
+        return 1
+
+
+def compiled(message: str) -> Tuple[str, List[str], int, Any]:
+    result = classify(message)
+    return result.intent, result.product_ids, result.quantity, result.topic
+
+
+def same_result(legacy: Tuple[str, List[str], int, Any], new: Tuple[str, List[str], int, Any]) -> bool:
+    """Compare what the handlers use; the old code also extracted IDs for intents that ignore them."""
+    intent, product_ids, quantity, topic = legacy
+    return new == (intent, product_ids if intent in ID_INTENTS else [], quantity, topic)
+
+
+def throughput(fn: Callable[[str], Any], messages: List[str], repeat: int) -> float:
+    """Return messages classified per second (best of repeat runs)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for message in messages:
+            fn(message)
+        best = min(best, time.perf_counter() - start)
+    return len(messages) / best
+
+
+def main(count: int, repeat: int):
+    messages = generate_messages(count)
+    legacy = LegacyClassifier()
+
+    mismatches = [m for m in messages if not same_result(legacy.classify(m), compiled(m))]
+    for message in mismatches[:10]:
+        print(f"mismatch: {message!r} legacy={legacy.classify(message)} compiled={compiled(message)}")
+
+    before = throughput(legacy.classify, messages, repeat)
+    after = throughput(compiled, messages, repeat)
+    print(f"{'classifier':<12} {'msgs/s':>12}")
+    print(f"{'sequential':<12} {before:>12,.0f}")
+    print(f"{'compiled':<12} {after:>12,.0f}  ({after / before:.1f}x)")
+    print(f"{len(messages)} messages, {len(mismatches)} mismatches")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=20000, help="Number of synthetic messages")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per classifier (best is reported)")
+    args = parser.parse_args()
+    main(args.messages, args.repeat)
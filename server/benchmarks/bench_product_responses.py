@@ -0,0 +1,63 @@
+"""
+Compare /api/products throughput: response_model validation vs
+pre-encoded orjson bytes cached on the Catalog.
+
+Usage (from server/):
+    python -m benchmarks.bench_product_responses --sizes 20,1000,10000 --requests 200
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+from fastapi import FastAPI, Response
+
+from app.api.products import Product, encode_products
+from app.services.catalog import Catalog
+from benchmarks.catalog_generator import generate_products
+
+
+def build_app(catalog: Catalog) -> FastAPI:
+    """Minimal app exposing the old and new list_products code paths."""
+    app = FastAPI()
+
+    @app.get("/legacy", response_model=List[Product])
+    async def legacy():
+        return catalog.products
+
+    @app.get("/encoded", response_model=List[Product])
+    async def encoded():
+        body = catalog.get_encoded("all", lambda: encode_products(catalog.products))
+        return Response(content=body, media_type="application/json")
+
+    return app
+
+
+async def measure(client: httpx.AsyncClient, path: str, requests: int) -> float:
+    """Return requests per second for sequential GETs on path."""
+    await client.get(path)  # warm up
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = await client.get(path)
+        response.raise_for_status()
+    return requests / (time.perf_counter() - start)
+
+
+async def main(sizes: List[int], requests: int):
+    print(f"{'products':>10} {'legacy req/s':>14} {'encoded req/s':>14} {'speedup':>8}")
+    for size in sizes:
+        catalog = Catalog(generate_products(size), version="bench")
+        transport = httpx.ASGITransport(app=build_app(catalog))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            legacy = await measure(client, "/legacy", requests)
+            encoded = await measure(client, "/encoded", requests)
+        print(f"{size:>10} {legacy:>14.1f} {encoded:>14.1f} {encoded / legacy:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="20,1000,10000", help="Comma-separated catalog sizes")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint and size")
+    args = parser.parse_args()
+    asyncio.run(main([int(s) for s in args.sizes.split(",")], args.requests))
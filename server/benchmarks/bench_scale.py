@@ -0,0 +1,211 @@
+"""
+Scale benchmark: feed synthetic catalogs through the product, cart,
+filter, search and embedding paths and report latency and memory per size.
+
+Usage (from server/):
+    python -m benchmarks.bench_scale --redis-url redis://localhost:6379/15
+    python -m benchmarks.bench_scale --sizes 1000,10000,100000,1000000 --embed-max 10000
+    python -m benchmarks.bench_scale --fake-redis   # needs fakeredis, no server required
+
+Use a scratch Redis database: the catalog cache keys are cleared before
+each size. The upstream API is replaced by the generated catalog and
+the embedding model by random vectors, so the numbers cover this
+service's own work only.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import resource
+import time
+from typing import List, Dict, Any, Callable, Awaitable, Optional
+
+import numpy as np
+
+from app.services import product_service, cart_service
+from app.services.catalog import Catalog
+from app.embeddings import chroma_client, embed_products
+from benchmarks.catalog_generator import generate_products
+
+
+BENCH_SESSION = "bench-scale"
+SEARCH_QUERIES = ["wireless headphones", "gold ring", "cotton jacket", "floral dress", "portable ssd", "gift"]
+EMBEDDING_DIM = 384
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Report:
+    """Prints (size, stage, ms per op, RSS and RSS delta) rows as stages finish."""
+
+    def __init__(self):
+        print(f"{'products':>10} {'stage':<28} {'ms/op':>10} {'ops':>5} {'rss MB':>9} {'Δrss MB':>9}")
+
+    def row(self, size: int, stage: str, ms: Optional[float], ops: int, rss_before: float, note: str = ""):
+        rss = rss_mb()
+        ms_text = f"{ms:>10.3f}" if ms is not None else f"{'-':>10}"
+        print(f"{size:>10} {stage:<28} {ms_text} {ops:>5} {rss:>9.1f} {rss - rss_before:>+9.1f} {note}".rstrip())
+
+
+async def timed(fn: Callable[[], Awaitable[Any]], repeat: int) -> float:
+    """Return mean milliseconds per awaited call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def timed_sync(fn: Callable[[], Any], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def substring_search(products: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
+    """The original linear substring scan, kept as a baseline."""
+    query = query.lower()
+    return [
+        p for p in products
+        if query in p.get("title", "").lower()
+        or query in p.get("description", "").lower()
+        or query in p.get("category", "").lower()
+    ]
+
+
+async def use_redis(redis_url: Optional[str], fake: bool):
+    if fake:
+        from fakeredis import aioredis as fake_aioredis, FakeServer
+        server = FakeServer()
+        product_service._redis_client = fake_aioredis.FakeRedis(server=server, decode_responses=True)
+        product_service._redis_binary_client = fake_aioredis.FakeRedis(server=server, decode_responses=False)
+    elif redis_url:
+        product_service.REDIS_URL = redis_url
+    else:
+        raise SystemExit("Pass --redis-url (or set REDIS_URL) or --fake-redis")
+
+
+def use_ephemeral_chroma():
+    import chromadb
+    chroma_client._chroma_client = chromadb.EphemeralClient()
+    chroma_client._collection = None
+
+
+async def bench_size(size: int, repeat: int, embed_max: int, report: Report):
+    rss = rss_mb()
+    start = time.perf_counter()
+    products = generate_products(size)
+    report.row(size, "generate", (time.perf_counter() - start) * 1000, 1, rss)
+
+    async def upstream():
+        return products
+
+    product_service._fetch_from_api = upstream
+    await product_service.clear_cache()
+
+    rss = rss_mb()
+    ms = await timed(lambda: product_service.get_products(), 1)
+    report.row(size, "get_products (upstream)", ms, 1, rss)
+
+    # Wait for the background index build so it does not skew later stages
+    catalog = await product_service.get_catalog()
+    catalog.warm()
+
+    async def from_redis():
+        product_service._catalog = None
+        try:
+            return await product_service._load_products()
+        finally:
+            product_service._catalog = catalog
+
+    rss = rss_mb()
+    ms = await timed(from_redis, repeat)
+    report.row(
+        size, "get_products (redis)", ms, repeat, rss,
+        f"storage={product_service.STORAGE_MODE} codec={product_service.BLOB_CODEC}"
+    )
+
+    rss = rss_mb()
+    ms = await timed(lambda: product_service.get_products(), repeat * 10)
+    report.row(size, "get_products (in-process)", ms, repeat * 10, rss)
+
+    ids = [str(p["id"]) for p in products[:: max(size // 10, 1)][:10]]
+
+    rss = rss_mb()
+    ms = await timed(lambda: product_service.get_product_by_id(ids[0]), repeat * 10)
+    report.row(size, "get_product_by_id", ms, repeat * 10, rss)
+
+    await cart_service.clear_cart(BENCH_SESSION)
+    for product_id in ids:
+        await cart_service.add_to_cart(BENCH_SESSION, product_id, 2)
+    rss = rss_mb()
+    ms = await timed(lambda: cart_service.get_cart(BENCH_SESSION), repeat * 10)
+    report.row(size, "get_cart (10 items)", ms, repeat * 10, rss)
+    await cart_service.clear_cart(BENCH_SESSION)
+
+    rss = rss_mb()
+    start = time.perf_counter()
+    Catalog(products, "bench").warm()
+    report.row(size, "build catalog+indexes", (time.perf_counter() - start) * 1000, 1, rss)
+
+    category = catalog.categories[0]
+    rss = rss_mb()
+    ms = timed_sync(lambda: catalog.get_category(category), repeat * 10)
+    report.row(size, "category lookup", ms, repeat * 10, rss)
+
+    rss = rss_mb()
+    ms = timed_sync(lambda: catalog.facet_index.query(category=category, min_price=20, max_price=200), repeat)
+    report.row(size, "filter (category+price)", ms, repeat, rss)
+
+    rss = rss_mb()
+    ms = timed_sync(lambda: [catalog.search_index.search(q) for q in SEARCH_QUERIES], repeat) / len(SEARCH_QUERIES)
+    report.row(size, "search (index)", ms, repeat * len(SEARCH_QUERIES), rss)
+
+    rss = rss_mb()
+    ms = timed_sync(lambda: [substring_search(products, q) for q in SEARCH_QUERIES], 1) / len(SEARCH_QUERIES)
+    report.row(size, "search (substring baseline)", ms, len(SEARCH_QUERIES), rss)
+
+    if size <= embed_max:
+        use_ephemeral_chroma()
+        rss = rss_mb()
+        start = time.perf_counter()
+        await embed_products.embed_and_store_products()
+        report.row(size, "embed_and_store_products", (time.perf_counter() - start) * 1000, 1, rss, "random vectors")
+    else:
+        report.row(size, "embed_and_store_products", None, 0, rss_mb(), f"skipped (> --embed-max {embed_max})")
+
+    await product_service.clear_cache()
+
+
+async def main(sizes: List[int], repeat: int, embed_max: int, redis_url: Optional[str], fake: bool):
+    await use_redis(redis_url, fake)
+    product_service.SNAPSHOT_PATH = ""
+
+    rng = np.random.default_rng(0)
+    embed_products.create_embeddings = lambda texts: rng.random((len(texts), EMBEDDING_DIM), dtype=np.float32).tolist()
+
+    report = Report()
+    for size in sizes:
+        await bench_size(size, repeat, embed_max, report)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated catalog sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="Calls per measurement (x10 for hot paths)")
+    parser.add_argument("--embed-max", type=int, default=10000, help="Largest size to run the embedding stage for")
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL"), help="Scratch Redis database")
+    parser.add_argument("--fake-redis", action="store_true", help="Use in-process fakeredis instead of a server")
+    parser.add_argument("--verbose", action="store_true", help="Keep application INFO logs on the console")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger("app").setLevel(logging.WARNING)
+    asyncio.run(main([int(s) for s in args.sizes.split(",")], args.repeat, args.embed_max, args.redis_url, args.fake_redis))
@@ -0,0 +1,116 @@
+"""
+Synthetic FakeStore-shaped catalogs at realistic scale.
+
+Titles and descriptions are drawn from per-category vocabularies with a
+Zipf-like word distribution, prices are log-normal and ratings cluster
+around 3.5-4.5, so text size, term frequencies and price spreads look
+like a real store rather than repeated filler.
+
+Usage (from server/):
+    python -m benchmarks.catalog_generator --count 10000 --output catalog_10k.json
+"""
+import argparse
+import json
+import random
+from typing import List, Dict, Any, Iterator
+
+
+CATEGORY_VOCABULARY: Dict[str, Dict[str, List[str]]] = {
+    "electronics": {
+        "nouns": ["laptop", "monitor", "ssd", "hard drive", "headphones", "speaker", "keyboard", "mouse",
+                  "router", "webcam", "charger", "tablet", "smartwatch", "earbuds", "projector", "camera"],
+        "adjectives": ["wireless", "portable", "4k", "gaming", "ultra-slim", "noise-cancelling",
+                       "bluetooth", "usb-c", "curved", "rugged", "fast-charging", "external"],
+        "words": ["battery", "display", "resolution", "storage", "performance", "compatible", "connectivity",
+                  "latency", "refresh", "rate", "warranty", "firmware", "ports", "power", "speed", "backup"],
+    },
+    "jewelery": {
+        "nouns": ["ring", "necklace", "bracelet", "earrings", "pendant", "bangle", "anklet", "brooch",
+                  "chain", "charm", "cufflinks", "tiara"],
+        "adjectives": ["gold-plated", "sterling silver", "rose gold", "diamond", "pearl", "vintage",
+                       "handcrafted", "titanium", "minimalist", "engraved", "stackable"],
+        "words": ["gift", "elegant", "sparkle", "stone", "carat", "polished", "wedding", "anniversary",
+                  "hypoallergenic", "clasp", "setting", "shine", "timeless", "crafted", "luxury"],
+    },
+    "men's clothing": {
+        "nouns": ["jacket", "t-shirt", "shirt", "jeans", "hoodie", "sweater", "chinos", "coat", "polo",
+                  "shorts", "blazer", "vest", "backpack"],
+        "adjectives": ["slim fit", "casual", "cotton", "waterproof", "lightweight", "classic", "outdoor",
+                       "padded", "stretch", "vintage", "premium"],
+        "words": ["comfortable", "breathable", "durable", "fabric", "pockets", "zipper", "sleeve", "collar",
+                  "machine", "wash", "season", "layering", "fit", "travel", "everyday", "hiking"],
+    },
+    "women's clothing": {
+        "nouns": ["dress", "blouse", "skirt", "cardigan", "jacket", "leggings", "jumpsuit", "top", "coat",
+                  "sweater", "raincoat", "tunic"],
+        "adjectives": ["floral", "casual", "elegant", "knit", "oversized", "wrap", "short sleeve",
+                       "long sleeve", "lightweight", "boat neck", "stretchy"],
+        "words": ["soft", "flattering", "fabric", "summer", "winter", "comfortable", "stylish", "pattern",
+                  "waist", "hem", "lining", "occasion", "office", "weekend", "breathable", "gentle"],
+    },
+}
+
+COMMON_WORDS = ["quality", "design", "perfect", "daily", "use", "material", "great", "value", "new",
+                "best", "brand", "size", "color", "easy", "care", "made", "feature", "style"]
+
+BRANDS = ["Acme", "Northwind", "Contoso", "Globex", "Initech", "Umbrella", "Stark", "Wayne", "Hooli",
+          "Vandelay", "Soylent", "Tyrell", "Cyberdyne", "Aperture", "Monarch", "Wonka"]
+
+
+def _zipf_choice(rng: random.Random, words: List[str]) -> str:
+    """Pick a word with probability roughly proportional to 1 / rank."""
+    return words[min(int(rng.paretovariate(1.0)) - 1, len(words) - 1)]
+
+
+def iter_products(count: int, seed: int = 42, start_id: int = 1) -> Iterator[Dict[str, Any]]:
+    """
+    Yield FakeStore-shaped products one at a time.
+    Args:
+        count: Number of products
+        seed: Random seed; the same seed always yields the same catalog
+        start_id: First product id
+    Returns:
+        Iterator[Dict[str, Any]]: Products with id, title, price, description, category, image and rating
+    """
+    rng = random.Random(seed)
+    categories = list(CATEGORY_VOCABULARY)
+    for product_id in range(start_id, start_id + count):
+        category = rng.choice(categories)
+        vocab = CATEGORY_VOCABULARY[category]
+        words = vocab["words"] + COMMON_WORDS
+        title = f"{rng.choice(BRANDS)} {rng.choice(vocab['adjectives'])} {rng.choice(vocab['nouns'])}"
+        if rng.random() < 0.3:
+            title += f" {rng.choice(['Pro', 'Max', 'Lite', 'Plus', 'Mini', 'XL'])}"
+        description = " ".join(_zipf_choice(rng, words) for _ in range(rng.randint(15, 70)))
+        yield {
+            "id": product_id,
+            "title": title,
+            "price": round(min(max(rng.lognormvariate(3.5, 1.0), 0.99), 9999.0), 2),
+            "description": description.capitalize() + ".",
+            "category": category,
+            "image": f"https://fakestoreapi.com/img/{product_id}.jpg",
+            "rating": {
+                "rate": round(min(max(rng.gauss(3.9, 0.6), 1.0), 5.0), 1),
+                "count": int(rng.paretovariate(1.2) * 10),
+            },
+        }
+
+
+def generate_products(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Generate a synthetic catalog of count products."""
+    return list(iter_products(count, seed))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1000, help="Number of products")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--output", default="-", help="Output file ('-' for stdout)")
+    args = parser.parse_args()
+
+    products = generate_products(args.count, args.seed)
+    if args.output == "-":
+        print(json.dumps(products))
+    else:
+        with open(args.output, "w") as f:
+            json.dump(products, f)